@@ -4,4 +4,5 @@ urlpatterns = [
     path('accounts/', include('apps.accounts.urls')),
     path('income/', include('apps.income.urls')),
     path('expense/', include('apps.expense.urls')),
+    path('reports/', include('apps.reports.urls')),
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Account, BalanceSwitchLog
+from .models import Account, AccountBalanceCheckpoint, AccountLedgerEntry, BalanceSwitchLog
+
 
 @admin.register(Account)
 class AccountAdmin(admin.ModelAdmin):
@@ -7,8 +8,29 @@ class AccountAdmin(admin.ModelAdmin):
     search_fields = ('name', 'account_type')
     list_filter = ('account_type', 'tenant', 'branch')
 
+
 @admin.register(BalanceSwitchLog)
 class BalanceSwitchLogAdmin(admin.ModelAdmin):
     list_display = ('from_account', 'to_account', 'amount', 'switch_date', 'tenant', 'branch', 'created_at', 'updated_at')
     search_fields = ('from_account__name', 'to_account__name')
-    list_filter = ('switch_date', 'tenant', 'branch')
\ No newline at end of file
+    list_filter = ('switch_date', 'tenant', 'branch')
+
+
+@admin.register(AccountLedgerEntry)
+class AccountLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('account', 'amount', 'effective_date', 'source_type', 'source_id', 'tenant', 'branch', 'created_at')
+    search_fields = ('account__name',)
+    list_filter = ('source_type', 'effective_date', 'tenant', 'branch')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AccountBalanceCheckpoint)
+class AccountBalanceCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('account', 'date', 'balance', 'created_at')
+    search_fields = ('account__name',)
+    list_filter = ('date',)
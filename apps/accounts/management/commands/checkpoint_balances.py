@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import Account
+from apps.accounts.services import create_checkpoints
+
+
+class Command(BaseCommand):
+    help = "Write account balance checkpoints so as-of balance lookups only sum recent ledger entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Checkpoint balances at the end of this day (YYYY-MM-DD, default yesterday).")
+        parser.add_argument('--tenant', help="Only checkpoint accounts of this tenant.")
+
+    def handle(self, *args, **options):
+        try:
+            through_date = date.fromisoformat(options['date']) if options['date'] else date.today() - timedelta(days=1)
+        except ValueError:
+            raise CommandError("--date must be in YYYY-MM-DD format.")
+
+        accounts = Account.objects.all()
+        if options['tenant']:
+            accounts = accounts.filter(tenant=options['tenant'])
+
+        written = create_checkpoints(through_date, accounts)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} checkpoint(s) at end of {through_date}."))
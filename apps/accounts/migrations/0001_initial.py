@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:50
+
+import datetime
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Account',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('account_type', models.CharField(choices=[('CASH', 'Cash'), ('BANK', 'Bank'), ('DEBT', 'Debt')], max_length=20)),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=15)),
+                ('tenant', models.UUIDField()),
+                ('branch', models.UUIDField()),
+                ('created_by', models.UUIDField()),
+                ('updated_by', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Account',
+                'verbose_name_plural': 'Accounts',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['tenant', 'branch', 'account_type'], name='account_scope_type_idx')],
+                'unique_together': {('name', 'tenant', 'branch')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BalanceSwitchLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, validators=[django.core.validators.MinValueValidator(0)])),
+                ('switch_date', models.DateField(default=datetime.date.today)),
+                ('tenant', models.UUIDField()),
+                ('branch', models.UUIDField()),
+                ('created_by', models.UUIDField()),
+                ('updated_by', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('from_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='from_switches', to='accounts.account')),
+                ('to_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='to_switches', to='accounts.account')),
+            ],
+            options={
+                'verbose_name': 'Balance Switch Log',
+                'verbose_name_plural': 'Balance Switch Logs',
+                'ordering': ['-switch_date'],
+                'indexes': [models.Index(fields=['tenant', 'branch', '-switch_date', '-created_at'], name='balswitch_scope_date_idx')],
+            },
+        ),
+    ]
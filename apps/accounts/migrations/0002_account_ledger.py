@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:00
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_ledger(apps, schema_editor):
+    """
+    Seed the ledger from existing history: confirmed incomes, paid expenses and
+    balance switches, plus an opening entry for whatever part of the current
+    balance that history does not explain.
+    """
+    Account = apps.get_model('accounts', 'Account')
+    BalanceSwitchLog = apps.get_model('accounts', 'BalanceSwitchLog')
+    AccountLedgerEntry = apps.get_model('accounts', 'AccountLedgerEntry')
+    Expense = apps.get_model('expense', 'Expense')
+    Income = apps.get_model('income', 'Income')
+
+    accounts = {account.pk: account for account in Account.objects.all()}
+    entries = []
+
+    def add(account_id, amount, effective_date, source_type, source_id):
+        account = accounts[account_id]
+        entries.append(AccountLedgerEntry(
+            account_id=account_id, amount=amount, effective_date=effective_date,
+            source_type=source_type, source_id=source_id, tenant=account.tenant, branch=account.branch,
+        ))
+
+    for pk, account_id, amount, entry_date in Income.objects.filter(status='confirmed').values_list('pk', 'account_id', 'amount', 'date'):
+        add(account_id, amount, entry_date, 'income', pk)
+    for pk, account_id, amount, entry_date in Expense.objects.filter(status='paid').values_list('pk', 'account_id', 'amount', 'date'):
+        add(account_id, -amount, entry_date, 'expense', pk)
+    for pk, from_id, to_id, amount, switch_date in BalanceSwitchLog.objects.values_list(
+        'pk', 'from_account_id', 'to_account_id', 'amount', 'switch_date'
+    ):
+        add(from_id, -amount, switch_date, 'balance_switch', pk)
+        add(to_id, amount, switch_date, 'balance_switch', pk)
+
+    explained = {}
+    for entry in entries:
+        explained[entry.account_id] = explained.get(entry.account_id, Decimal("0")) + entry.amount
+    for account in accounts.values():
+        opening = account.balance - explained.get(account.pk, Decimal("0"))
+        if opening:
+            add(account.pk, opening, account.created_at.date(), 'opening', None)
+
+    AccountLedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('expense', '0001_initial'),
+        ('income', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='accounts.account')),
+            ],
+            options={
+                'verbose_name': 'Account Balance Checkpoint',
+                'verbose_name_plural': 'Account Balance Checkpoints',
+                'ordering': ['-date'],
+                'unique_together': {('account', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('effective_date', models.DateField()),
+                ('source_type', models.CharField(choices=[('opening', 'Opening Balance'), ('adjustment', 'Adjustment'), ('income', 'Income'), ('expense', 'Expense'), ('balance_switch', 'Balance Switch')], max_length=20)),
+                ('source_id', models.BigIntegerField(blank=True, null=True)),
+                ('tenant', models.UUIDField()),
+                ('branch', models.UUIDField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='accounts.account')),
+            ],
+            options={
+                'verbose_name': 'Account Ledger Entry',
+                'verbose_name_plural': 'Account Ledger Entries',
+                'ordering': ['-effective_date', '-id'],
+                'indexes': [models.Index(fields=['account', 'effective_date'], name='ledger_account_date_idx'), models.Index(fields=['source_type', 'source_id'], name='ledger_source_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
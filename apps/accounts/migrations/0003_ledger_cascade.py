@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_account_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accountledgerentry',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='accounts.account'),
+        ),
+    ]
@@ -27,6 +27,9 @@ class Account(models.Model):
         verbose_name_plural = 'Accounts'
         unique_together = ('name', 'tenant', 'branch')
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['tenant', 'branch', 'account_type'], name='account_scope_type_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.account_type}) - Tenant: {self.tenant}"
@@ -58,6 +61,9 @@ class BalanceSwitchLog(models.Model):
         verbose_name = 'Balance Switch Log'
         verbose_name_plural = 'Balance Switch Logs'
         ordering = ['-switch_date']
+        indexes = [
+            models.Index(fields=['tenant', 'branch', '-switch_date', '-created_at'], name='balswitch_scope_date_idx'),
+        ]
 
     def __str__(self):
         return f"Switch from {self.from_account} to {self.to_account} ({self.amount}) on {self.switch_date}"
@@ -68,4 +74,63 @@ class BalanceSwitchLog(models.Model):
         if self.from_account.tenant != self.to_account.tenant or self.from_account.branch != self.to_account.branch:
             raise ValidationError("Accounts must belong to the same tenant and branch.")
         if self.amount <= 0:
-            raise ValidationError("Switch amount must be positive.")
\ No newline at end of file
+            raise ValidationError("Switch amount must be positive.")
+
+class AccountLedgerEntry(models.Model):
+    SOURCE_TYPES = (
+        ('opening', 'Opening Balance'),
+        ('adjustment', 'Adjustment'),
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+        ('balance_switch', 'Balance Switch'),
+    )
+
+    # The ledger is deleted with its account, like the account's balance switches and checkpoints
+    account = models.ForeignKey(Account, related_name='ledger_entries', on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    effective_date = models.DateField()
+    source_type = models.CharField(max_length=20, choices=SOURCE_TYPES)
+    source_id = models.BigIntegerField(null=True, blank=True)
+    tenant = models.UUIDField()
+    branch = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Account Ledger Entry'
+        verbose_name_plural = 'Account Ledger Entries'
+        ordering = ['-effective_date', '-id']
+        indexes = [
+            models.Index(fields=['account', 'effective_date'], name='ledger_account_date_idx'),
+            models.Index(fields=['source_type', 'source_id'], name='ledger_source_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account.name} {self.amount:+} on {self.effective_date} ({self.source_type})"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValidationError("Ledger entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Ledger entries are append-only.")
+
+
+class AccountBalanceCheckpoint(models.Model):
+    """
+    Balance of an account at the end of ``date``, i.e. the sum of every ledger
+    entry effective on or before that day.
+    """
+    account = models.ForeignKey(Account, related_name='balance_checkpoints', on_delete=models.CASCADE)
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Account Balance Checkpoint'
+        verbose_name_plural = 'Account Balance Checkpoints'
+        unique_together = ('account', 'date')
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.account.name} = {self.balance} at end of {self.date}"
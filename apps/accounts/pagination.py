@@ -1,5 +1,6 @@
 from rest_framework.pagination import PageNumberPagination
 from drf_yasg import openapi
+from config.pagination import KeysetPagination
 
 
 class CustomPagination(PageNumberPagination):
@@ -7,6 +8,10 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class BalanceSwitchCursorPagination(KeysetPagination):
+    date_field = 'switch_date'
+
+
 PAGINATION_PARAMS = [
     openapi.Parameter(
         'page',
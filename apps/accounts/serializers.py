@@ -3,6 +3,35 @@ from .models import Account, BalanceSwitchLog
 from datetime import date
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.Field):
+    """
+    Resolves a primary key against a ``{pk: instance}`` map stored in the
+    serializer context under ``context_key``, so validating many rows does not
+    cost one lookup query per row.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Invalid pk "{pk_value}" - object does not exist.',
+        'incorrect_type': 'Incorrect type. Expected pk value, received {data_type}.',
+    }
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.context[self.context_key][pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+    def to_representation(self, value):
+        return value.pk
+
+
 class AccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = Account
@@ -20,10 +49,14 @@ class BalanceSwitchLogSerializer(serializers.ModelSerializer):
         read_only_fields = ('tenant', 'branch', 'created_by', 'updated_by', 'created_at', 'updated_at')
 
     def validate(self, attrs):
-        from_account = attrs.get('from_account')
-        to_account = attrs.get('to_account')
-        amount = attrs.get('amount')
-        switch_date = attrs.get('switch_date', date.today())
+        # A partial update keeps the switch's current value of every field it leaves out
+        def value(name, default=None):
+            return attrs[name] if name in attrs else getattr(self.instance, name, default)
+
+        from_account = value('from_account')
+        to_account = value('to_account')
+        amount = value('amount')
+        switch_date = value('switch_date', date.today())
 
         if from_account == to_account:
             raise serializers.ValidationError("Source and destination accounts must be different.")
@@ -34,9 +67,14 @@ class BalanceSwitchLogSerializer(serializers.ModelSerializer):
         if switch_date > date.today():
             raise serializers.ValidationError("Switch date cannot be in the future.")
 
-        if from_account.balance < amount:
+        # Early rejection only; post_balance_changes re-checks against the locked balance.
+        available = from_account.balance
+        if self.instance is not None and self.instance.from_account_id == from_account.pk:
+            # The update reverses the switch's current debit first
+            available += self.instance.amount
+        if available < amount:
             raise serializers.ValidationError(
-                f"Insufficient balance in {from_account.name} ({from_account.balance}) for transfer of {amount}."
+                f"Insufficient balance in {from_account.name} ({available}) for transfer of {amount}."
             )
 
         return attrs
\ No newline at end of file
@@ -0,0 +1,333 @@
+import time
+from collections import defaultdict, namedtuple
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from apps.outbox.services import record_events
+from apps.reports.services import apply_rollups
+from config.cache import bump_data_version
+from config.metrics import BALANCE_POSTING_SECONDS, BALANCE_POSTINGS
+from .models import Account, AccountBalanceCheckpoint, AccountLedgerEntry
+
+
+BULK_BATCH_SIZE = 500
+
+# One signed change to an account balance and the ledger row recording it
+Posting = namedtuple('Posting', ['account_id', 'amount', 'source_type', 'source_id', 'effective_date'])
+
+
+def entry_posting(entry, sign=1):
+    """
+    Posting for an income/expense entry; ``sign=-1`` reverses it at the entry's own date.
+    """
+    return Posting(
+        entry.account_id, sign * entry.BALANCE_SIGN * entry.amount,
+        entry._meta.model_name, entry.pk, entry.date,
+    )
+
+
+def switch_postings(switch, sign=1):
+    amount = sign * switch.amount
+    return [
+        Posting(switch.from_account_id, -amount, 'balance_switch', switch.pk, switch.switch_date),
+        Posting(switch.to_account_id, amount, 'balance_switch', switch.pk, switch.switch_date),
+    ]
+
+
+def post_balance_changes(postings):
+    """
+    Apply postings to account balances and the ledger in one transaction.
+
+    Amounts are netted per account, the accounts are locked with
+    ``SELECT ... FOR UPDATE`` in ascending id order (so concurrent postings over
+    the same accounts cannot deadlock), checked against the locked balances and
+    updated with a single ``F()`` expression UPDATE, so no concurrent change is
+    lost. Every posting is appended to the account ledger and queued as a
+    ``ledger.posted`` outbox event, and checkpoints made stale by backdated
+    postings are dropped. Raises ValidationError if any balance would drop
+    below zero. Returns ``{account_id: new_balance}``.
+    """
+    postings = [posting for posting in postings if posting.amount]
+    deltas = defaultdict(Decimal)
+    earliest = {}
+    for posting in postings:
+        deltas[posting.account_id] += posting.amount
+        earliest[posting.account_id] = min(earliest.get(posting.account_id, posting.effective_date), posting.effective_date)
+    if not postings:
+        return {}
+
+    started = time.perf_counter()
+    try:
+        new_balances = _apply_postings(postings, deltas, earliest)
+    except Exception:
+        BALANCE_POSTING_SECONDS.observe(time.perf_counter() - started, result='error')
+        raise
+    BALANCE_POSTING_SECONDS.observe(time.perf_counter() - started, result='ok')
+    for posting in postings:
+        BALANCE_POSTINGS.inc(source_type=posting.source_type)
+    return new_balances
+
+
+def _apply_postings(postings, deltas, earliest):
+    with transaction.atomic():
+        locked = (
+            Account.objects.select_for_update()
+            .filter(pk__in=deltas)
+            .order_by('pk')
+            .values_list('pk', 'name', 'balance', 'tenant', 'branch')
+        )
+        new_balances = {}
+        scopes = {}
+        for account_id, name, balance, tenant, branch in locked:
+            scopes[account_id] = (tenant, branch)
+            new_balances[account_id] = balance + deltas[account_id]
+            if new_balances[account_id] < 0:
+                raise ValidationError(
+                    f"Insufficient balance in {name} ({balance}) for a debit of {-deltas[account_id]}."
+                )
+        missing = set(deltas) - set(new_balances)
+        if missing:
+            raise ValidationError(f"Unknown account(s): {', '.join(str(pk) for pk in sorted(missing))}.")
+
+        changed = {account_id: delta for account_id, delta in deltas.items() if delta}
+        if changed:
+            amount_field = DecimalField(max_digits=15, decimal_places=2)
+            Account.objects.filter(pk__in=changed).update(
+                balance=Case(
+                    *[When(pk=account_id, then=F('balance') + Value(delta, output_field=amount_field))
+                      for account_id, delta in changed.items()],
+                    output_field=amount_field,
+                ),
+                updated_at=timezone.now(),
+            )
+
+        AccountLedgerEntry.objects.bulk_create([
+            AccountLedgerEntry(
+                account_id=posting.account_id, amount=posting.amount, effective_date=posting.effective_date,
+                source_type=posting.source_type, source_id=posting.source_id,
+                tenant=scopes[posting.account_id][0], branch=scopes[posting.account_id][1],
+            )
+            for posting in postings
+        ], batch_size=BULK_BATCH_SIZE)
+        record_events(
+            ('ledger.posted', scopes[posting.account_id][0], {
+                'account': posting.account_id,
+                'branch': scopes[posting.account_id][1],
+                'amount': posting.amount,
+                'balance': new_balances[posting.account_id],
+                'source_type': posting.source_type,
+                'source_id': posting.source_id,
+                'effective_date': posting.effective_date,
+            })
+            for posting in postings
+        )
+
+        stale = Q()
+        for account_id, effective_date in earliest.items():
+            stale |= Q(account_id=account_id, date__gte=effective_date)
+        AccountBalanceCheckpoint.objects.filter(stale).delete()
+
+        for tenant in {tenant for tenant, _ in scopes.values()}:
+            bump_data_version(tenant, Account)
+    return new_balances
+
+
+def balance_as_of(account, as_of):
+    """
+    Balance of ``account`` at the end of ``as_of``: the latest checkpoint on or
+    before that day plus the ledger entries effective after it.
+    """
+    checkpoint = (
+        AccountBalanceCheckpoint.objects.filter(account=account, date__lte=as_of)
+        .order_by('-date')
+        .values_list('date', 'balance')
+        .first()
+    )
+    tail = AccountLedgerEntry.objects.filter(account=account, effective_date__lte=as_of)
+    if checkpoint is None:
+        start_balance = Decimal("0")
+    else:
+        start_balance = checkpoint[1]
+        tail = tail.filter(effective_date__gt=checkpoint[0])
+    return start_balance + (tail.aggregate(total=Sum('amount'))['total'] or Decimal("0"))
+
+
+def create_checkpoints(through_date, accounts=None):
+    """
+    Checkpoint every account (or ``accounts``) that has ledger activity after
+    its latest checkpoint, at the end of ``through_date``. Returns the number written.
+    """
+    accounts = Account.objects.all() if accounts is None else accounts
+    written = 0
+    for account_id in accounts.values_list('pk', flat=True).iterator():
+        with transaction.atomic():
+            # Postings lock the account too, so none can commit (and clear stale
+            # checkpoints) between reading the ledger and writing the checkpoint
+            account = Account.objects.select_for_update().filter(pk=account_id).first()
+            if account is None:
+                continue
+            latest = (
+                AccountBalanceCheckpoint.objects.filter(account=account, date__lte=through_date)
+                .order_by('-date').values_list('date', flat=True).first()
+            )
+            activity = AccountLedgerEntry.objects.filter(account=account, effective_date__lte=through_date)
+            if latest is not None:
+                activity = activity.filter(effective_date__gt=latest)
+            if latest == through_date or not activity.exists():
+                continue
+            AccountBalanceCheckpoint.objects.update_or_create(
+                account=account, date=through_date, defaults={'balance': balance_as_of(account, through_date)}
+            )
+            written += 1
+    return written
+
+
+def transfer(switch):
+    return post_balance_changes(switch_postings(switch))
+
+
+def adjust_balance(account, new_balance, source_type='adjustment'):
+    """
+    Set ``account``'s balance through the ledger, posting the difference as of today.
+    """
+    with transaction.atomic():
+        current = Account.objects.select_for_update().values_list('balance', flat=True).get(pk=account.pk)
+        return post_balance_changes([
+            Posting(account.pk, new_balance - current, source_type, None, date.today()),
+        ])
+
+
+def bulk_import_entries(serializer_class, rollup_model, rows, context, save_kwargs, dry_run=False):
+    """
+    Validate and insert many income/expense rows at once.
+
+    Categories and accounts of the caller's branches are preloaded once,
+    rows are validated in batches of ``BULK_BATCH_SIZE`` (by the same
+    ``validate`` as single creates, payment checks included), references are
+    checked for uniqueness with a single query and the rows are inserted with
+    ``bulk_create``. Rows created in the posted status are applied to the
+    account balances and monthly rollups as one netted posting. Nothing is
+    written if any row fails or ``dry_run`` is set.
+    """
+    model = serializer_class.Meta.model
+    category_model = model._meta.get_field('category').related_model
+    scope = {'tenant': save_kwargs['tenant'], 'branch__in': context['request'].auth['branches']}
+    context = {
+        **context,
+        'categories': {category.pk: category for category in category_model.objects.filter(**scope)},
+        'accounts': {account.pk: account for account in Account.objects.filter(**scope)},
+    }
+
+    references = [str(row.get('reference', '')) for row in rows]
+    taken = set(
+        model.objects.filter(
+            tenant=save_kwargs['tenant'], branch=save_kwargs['branch'], reference__in=references
+        ).values_list('reference', flat=True)
+    )
+
+    entries = []
+    errors = []
+    for start in range(0, len(rows), BULK_BATCH_SIZE):
+        for index, row in enumerate(rows[start:start + BULK_BATCH_SIZE], start):
+            serializer = serializer_class(data=row, context=context)
+            if not serializer.is_valid():
+                errors.append({'row': index, 'errors': serializer.errors})
+                continue
+            reference = serializer.validated_data['reference']
+            if reference in taken:
+                errors.append({'row': index, 'errors': {'reference': ["An entry with this reference already exists."]}})
+                continue
+            taken.add(reference)
+            entries.append(model(**serializer.validated_data, **save_kwargs))
+
+    result = {'dry_run': dry_run, 'received': len(rows), 'valid': len(entries), 'created': 0, 'errors': errors}
+    if errors or dry_run:
+        return result
+
+    with transaction.atomic():
+        created = model.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+        posted = [entry for entry in created if entry.status == model.POSTED_STATUS]
+        post_balance_changes(entry_posting(entry) for entry in posted)
+        apply_rollups(rollup_model, posted)
+        bump_data_version(save_kwargs['tenant'], model)
+
+    result['created'] = len(created)
+    return result
+
+
+def save_entry(serializer, rollup_model, **save_kwargs):
+    """
+    Save an income/expense serializer (create or update) in one transaction.
+
+    An entry saved in the posted status is applied to its account balance and
+    monthly rollup, and an updated entry that was already posted is reversed
+    first, so balances, the ledger and the rollups always follow the entry.
+    """
+    model = serializer.Meta.model
+    with transaction.atomic():
+        previous = None
+        if serializer.instance is not None:
+            previous = model.objects.select_for_update(of=('self',)).select_related('account').get(pk=serializer.instance.pk)
+            if previous.status != model.POSTED_STATUS:
+                previous = None
+        entry = serializer.save(**save_kwargs)
+        unposted = [previous] if previous else []
+        posted = [entry] if entry.status == model.POSTED_STATUS else []
+        post_balance_changes(
+            [entry_posting(entry) for entry in posted]
+            + [entry_posting(entry, sign=-1) for entry in unposted]
+        )
+        apply_rollups(rollup_model, posted)
+        apply_rollups(rollup_model, unposted, sign=-1)
+    return entry
+
+
+def transition_entries(queryset, ids, to_status, check, rollup_model, updates=None):
+    """
+    Move the income/expense entries ``ids`` of ``queryset`` to ``to_status``
+    in one transaction.
+
+    Entries are locked, ``check(entry)`` returns an error message for any that
+    may not make the transition (they are skipped), and the balance effect of
+    every entry entering or leaving the posted status is netted per account
+    and posted at once. Returns ``{id: None | error}``.
+    """
+    model = queryset.model
+    results = {}
+    with transaction.atomic():
+        entries = {
+            entry.pk: entry
+            for entry in queryset.select_for_update(of=('self',))
+            .select_related('account', 'category')
+            .filter(pk__in=ids)
+            .order_by('pk')
+        }
+        moving = []
+        for pk in ids:
+            entry = entries.get(pk)
+            if entry is None:
+                results[pk] = "Not found."
+                continue
+            results[pk] = check(entry)
+            if results[pk] is None:
+                moving.append(entry)
+
+        posted = [entry for entry in moving if to_status == model.POSTED_STATUS]
+        unposted = [entry for entry in moving if entry.status == model.POSTED_STATUS and to_status != model.POSTED_STATUS]
+        post_balance_changes(
+            [entry_posting(entry) for entry in posted]
+            + [entry_posting(entry, sign=-1) for entry in unposted]
+        )
+        model.objects.filter(pk__in=[entry.pk for entry in moving]).update(
+            status=to_status, updated_at=timezone.now(), **(updates or {})
+        )
+        apply_rollups(rollup_model, posted)
+        apply_rollups(rollup_model, unposted, sign=-1)
+        for tenant in {entry.tenant for entry in moving}:
+            bump_data_version(tenant, model)
+    return results
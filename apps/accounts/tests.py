@@ -0,0 +1,216 @@
+import random
+import sys
+import threading
+import time
+import unittest
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.expense.models import Expense, ExpenseCategory
+from apps.testing import QueryPlanAssertions, ScopedTestCase
+from .models import Account, AccountBalanceCheckpoint, AccountLedgerEntry, BalanceSwitchLog
+from .services import Posting, balance_as_of, create_checkpoints, post_balance_changes, switch_postings
+
+
+class AccountCreateTests(ScopedTestCase):
+    def test_negative_opening_balance_is_rejected(self):
+        response = self.client.post('/api/v1/accounts/accounts/', {'name': 'Till', 'account_type': 'CASH', 'balance': '-5.00'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Account.objects.filter(tenant=self.tenant).exists())
+
+
+class AccountDestroyTests(ScopedTestCase):
+    def create_account(self, balance):
+        response = self.client.post('/api/v1/accounts/accounts/', {'name': 'Till', 'account_type': 'CASH', 'balance': balance})
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def test_account_with_ledger_history_is_deleted_with_its_ledger(self):
+        account_id = self.create_account('50.00')
+        self.assertTrue(AccountLedgerEntry.objects.filter(account_id=account_id).exists())
+
+        response = self.client.delete(f'/api/v1/accounts/accounts/{account_id}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Account.objects.filter(pk=account_id).exists())
+        self.assertFalse(AccountLedgerEntry.objects.filter(account_id=account_id).exists())
+
+    def test_account_used_by_entries_is_not_deleted(self):
+        account_id = self.create_account('50.00')
+        category = ExpenseCategory.objects.create(name='Rent', **self.scope)
+        Expense.objects.create(
+            date='2026-01-05', category=category, account_id=account_id, amount=Decimal("10.00"),
+            description='Rent', reference='R-1', **self.scope,
+        )
+
+        response = self.client.delete(f'/api/v1/accounts/accounts/{account_id}/')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Account.objects.filter(pk=account_id).exists())
+
+
+class BalanceSwitchUpdateTests(ScopedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.till, self.bank, self.safe = Account.objects.bulk_create([
+            Account(name=name, account_type='CASH', balance=Decimal("50.00"), **self.scope) for name in ('Till', 'Bank', 'Safe')
+        ])
+        response = self.client.post('/api/v1/accounts/balance-switches/', {
+            'from_account': self.till.pk, 'to_account': self.bank.pk, 'amount': '20.00', 'switch_date': self.today,
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        self.switch_id = response.data['id']
+
+    def balances(self):
+        return [account.balance for account in Account.objects.filter(pk__in=[self.till.pk, self.bank.pk, self.safe.pk]).order_by('name')]
+
+    def patch(self, data):
+        return self.client.patch(f'/api/v1/accounts/balance-switches/{self.switch_id}/', data)
+
+    def test_patching_the_amount_reposts_the_difference(self):
+        # The current debit counts as available, so the whole balance can be moved
+        response = self.patch({'amount': '50.00'})
+
+        self.assertEqual(response.status_code, 200, response.data)
+        # Bank, Safe, Till
+        self.assertEqual(self.balances(), [Decimal("100.00"), Decimal("50.00"), Decimal("0.00")])
+
+    def test_patching_one_account_keeps_the_other(self):
+        response = self.patch({'to_account': self.safe.pk})
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.balances(), [Decimal("50.00"), Decimal("70.00"), Decimal("30.00")])
+
+    def test_patching_to_the_same_account_is_rejected(self):
+        response = self.patch({'to_account': self.till.pk})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.balances(), [Decimal("70.00"), Decimal("50.00"), Decimal("30.00")])
+
+
+class CheckpointTests(ScopedTestCase):
+    def test_checkpoint_matches_the_ledger_and_is_cleared_by_a_backdated_posting(self):
+        account = Account.objects.create(name='Till', account_type='CASH', **self.scope)
+        accounts = Account.objects.filter(pk=account.pk)
+        yesterday = self.today - timedelta(days=1)
+        post_balance_changes([Posting(account.pk, Decimal("30.00"), 'adjustment', None, yesterday - timedelta(days=1))])
+
+        self.assertEqual(create_checkpoints(yesterday, accounts), 1)
+        self.assertEqual(AccountBalanceCheckpoint.objects.get(account=account).balance, Decimal("30.00"))
+        # No ledger activity since that checkpoint
+        self.assertEqual(create_checkpoints(yesterday, accounts), 0)
+
+        post_balance_changes([Posting(account.pk, Decimal("-5.00"), 'adjustment', None, yesterday)])
+
+        self.assertFalse(AccountBalanceCheckpoint.objects.filter(account=account).exists())
+        self.assertEqual(balance_as_of(account, yesterday), Decimal("25.00"))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite's")
+class AccountIndexTests(QueryPlanAssertions, TestCase):
+    def test_hot_queries_use_the_scope_indexes(self):
+        scope = {'tenant': uuid.uuid4(), 'branch__in': [uuid.uuid4()]}
+
+        self.assertUsesIndex(Account.objects.filter(**scope, account_type='CASH'), 'account_scope_type_idx')
+        self.assertUsesIndex(
+            BalanceSwitchLog.objects.filter(**scope).order_by('-switch_date', '-created_at', '-id'), 'balswitch_scope_date_idx'
+        )
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class BalanceSwitchListQueryTests(ScopedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.accounts = Account.objects.bulk_create([
+            Account(name=f'Account {n}', account_type='BANK', balance=Decimal("1000.00"), **self.scope) for n in range(4)
+        ])
+
+    def create_switches(self, count):
+        BalanceSwitchLog.objects.bulk_create([
+            BalanceSwitchLog(
+                from_account=self.accounts[n % 4], to_account=self.accounts[(n + 1) % 4], amount=Decimal("1.00"),
+                switch_date=self.today - timedelta(days=n), **self.scope,
+            )
+            for n in range(count)
+        ])
+
+    def count_queries(self, params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/v1/accounts/balance-switches/', params)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_query_count_does_not_grow_with_the_rows_returned(self):
+        self.create_switches(2)
+        few = self.count_queries({'page_size': 100})
+
+        self.create_switches(40)
+
+        self.assertEqual(self.count_queries({'page_size': 100}), few)
+
+
+class ConcurrentTransferTests(TransactionTestCase):
+    THREADS = 4
+    TRANSFERS_PER_THREAD = 25
+
+    def test_concurrent_transfers_lose_no_updates(self):
+        scope = {'tenant': uuid.uuid4(), 'branch': uuid.uuid4(), 'created_by': uuid.uuid4()}
+        accounts = Account.objects.bulk_create([
+            Account(name=f'Account {n}', account_type='BANK', balance=Decimal("100.00"), **scope) for n in range(4)
+        ])
+        ids = [account.pk for account in accounts]
+        completed, rejected, errors = [], [], []
+
+        def worker(offset):
+            try:
+                for n in range(self.TRANSFERS_PER_THREAD):
+                    # Opposite directions across threads, so lock ordering matters
+                    from_id, to_id = ids[(offset + n) % 4], ids[(offset + n + 1 + offset % 2) % 4]
+                    switch = BalanceSwitchLog(
+                        from_account_id=from_id, to_account_id=to_id, amount=Decimal("7.00"), switch_date=date.today(), **scope
+                    )
+                    while True:
+                        try:
+                            post_balance_changes(switch_postings(switch))
+                        except DjangoValidationError:
+                            rejected.append(switch)
+                        except OperationalError:
+                            # SQLite allows one writer at a time; other backends block on the row locks instead
+                            time.sleep(random.uniform(0, 0.005))
+                            continue
+                        else:
+                            completed.append(switch)
+                        break
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(self.THREADS)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(completed) + len(rejected), self.THREADS * self.TRANSFERS_PER_THREAD)
+        balances = dict(Account.objects.filter(pk__in=ids).values_list('pk', 'balance'))
+        self.assertEqual(sum(balances.values()), Decimal("400.00"))
+        self.assertTrue(all(balance >= 0 for balance in balances.values()), balances)
+        expected = {pk: Decimal("100.00") for pk in ids}
+        for switch in completed:
+            expected[switch.from_account_id] -= switch.amount
+            expected[switch.to_account_id] += switch.amount
+        self.assertEqual(balances, expected)
+        self.assertEqual(AccountLedgerEntry.objects.filter(account_id__in=ids).count(), 2 * len(completed))
+        sys.stderr.write(f"\n{len(completed) / elapsed:.0f} transfers/sec ({len(completed)} posted, "
+                         f"{len(rejected)} rejected, {self.THREADS} threads, {connection.vendor}) ... ")
@@ -1,8 +1,11 @@
+import csv
+import io
 from drf_yasg.utils import swagger_auto_schema
+from apps.reports.services import parse_year_month, period_bounds
 from .pagination import PAGINATION_PARAMS
 
 
-def swagger_helper(tags, model):
+def swagger_helper(tags, model, parameters=PAGINATION_PARAMS):
     def decorators(func):
         descriptions = {
             "list": f"Retrieve a list of {model}",
@@ -14,6 +17,80 @@ def swagger_helper(tags, model):
 
         action_type = func.__name__
         get_description = descriptions.get(action_type, f"{action_type} {model}")
-        return swagger_auto_schema(manual_parameters=PAGINATION_PARAMS, operation_id=f"{action_type} {model}", operation_description=get_description, tags=[tags])(func)
+        return swagger_auto_schema(manual_parameters=parameters, operation_id=f"{action_type} {model}", operation_description=get_description, tags=[tags])(func)
 
     return decorators
+
+
+BULK_MAX_ROWS = 10000
+
+
+def parse_bulk_rows(request):
+    """
+    Read bulk rows from a JSON array body or a CSV upload in the ``file`` field.
+    Empty CSV cells are dropped so model defaults apply. Raises ValueError.
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            reader = csv.DictReader(io.TextIOWrapper(upload.file, encoding='utf-8-sig'))
+            rows = [{key: value for key, value in row.items() if key and value != ''} for row in reader]
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f"Could not read CSV upload: {e}")
+    elif isinstance(request.data, list):
+        rows = request.data
+    else:
+        raise ValueError("Send a JSON array of entries or a CSV file in the 'file' field.")
+
+    if not rows:
+        raise ValueError("No entries to import.")
+    if len(rows) > BULK_MAX_ROWS:
+        raise ValueError(f"At most {BULK_MAX_ROWS} entries can be imported per request.")
+    if not all(isinstance(row, dict) for row in rows):
+        raise ValueError("Each entry must be an object.")
+    return rows
+
+
+def parse_bulk_selection(data, queryset):
+    """
+    Resolve the entries a bulk action targets, either ``{"ids": [...]}`` or
+    ``{"filter": {"status": ..., "year": ..., "month": ..., "category": ..., "account": ...}}``.
+    Returns a list of ids. Raises ValueError.
+    """
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            raise ValueError("'ids' must be a list of integers.")
+    elif isinstance(data.get('filter'), dict):
+        criteria = dict(data['filter'])
+        year, month = criteria.pop('year', None), criteria.pop('month', None)
+        unknown = set(criteria) - {'status', 'category', 'account'}
+        if unknown:
+            raise ValueError(f"Unsupported filter(s): {', '.join(sorted(unknown))}.")
+        if month and not year:
+            raise ValueError("'month' requires 'year'.")
+        if year:
+            start, end = period_bounds(*parse_year_month(year, month))
+            criteria.update(date__gte=start, date__lt=end)
+        ids = list(queryset.filter(**criteria).values_list('pk', flat=True)[:BULK_MAX_ROWS + 1])
+    else:
+        raise ValueError("Send either 'ids' or a 'filter' object.")
+
+    if len(ids) > BULK_MAX_ROWS:
+        raise ValueError(f"At most {BULK_MAX_ROWS} entries can be processed per request.")
+    return list(dict.fromkeys(ids))
+
+
+def filter_by_period(queryset, params, date_field='date', with_status=True):
+    """
+    Narrow ``queryset`` to the optional ``year``/``month``/``status`` query params. Raises ValueError.
+    """
+    year, month = params.get('year'), params.get('month')
+    if month and not year:
+        raise ValueError("'month' requires 'year'.")
+    if year:
+        start, end = period_bounds(*parse_year_month(year, month))
+        queryset = queryset.filter(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+    if with_status and params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    return queryset
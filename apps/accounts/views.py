@@ -1,17 +1,37 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+from datetime import date
+from decimal import Decimal
 from .models import Account, BalanceSwitchLog
 from .serializers import AccountSerializer, BalanceSwitchLogSerializer
-from datetime import date
+from .services import adjust_balance, balance_as_of, post_balance_changes, switch_postings, transfer
 from .utils import swagger_helper
+from .pagination import BalanceSwitchCursorPagination
+from apps.reports.exports import BALANCE_SWITCH_EXPORT_COLUMNS
+from config.authentication import get_tenant_scope
+from config.cache import conditional_response
+from .utils import filter_by_period
+from config.export import stream_export
+from config.pagination import CURSOR_PAGINATION_PARAMS
+from config.renderers import CSVRenderer, NDJSONRenderer
+from config.serialization import SparseFieldsMixin
 
 
 class AccountViewSet(viewsets.ModelViewSet):
     serializer_class = AccountSerializer
-    queryset = Account.objects.all()
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Account.objects.none()
+        return Account.objects.filter(**get_tenant_scope(self.request))
 
     @swagger_helper("Accounts", "Account")
+    @conditional_response(Account)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -20,6 +40,7 @@ class AccountViewSet(viewsets.ModelViewSet):
         return super().create(request, *args, **kwargs)
 
     @swagger_helper("Accounts", "Account")
+    @conditional_response(Account)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -43,32 +64,87 @@ class AccountViewSet(viewsets.ModelViewSet):
 
     @swagger_helper("Accounts", "Account")
     def perform_create(self, serializer):
-        serializer.save(
-            tenant=self.request.auth['tenant'],
-            branch=self.request.auth['branches'][0],  # Using first branch
-            created_by=self.request.user.id
-        )
+        opening_balance = serializer.validated_data.pop('balance', Decimal("0"))
+        with transaction.atomic():
+            account = serializer.save(
+                tenant=self.request.auth['tenant'],
+                branch=self.request.auth['branches'][0],  # Using first branch
+                created_by=self.request.user.id
+            )
+            # The opening balance goes through the ledger like any other posting
+            if opening_balance:
+                try:
+                    balances = adjust_balance(account, opening_balance, 'opening')
+                except DjangoValidationError as e:
+                    raise serializers.ValidationError(e.messages)
+                account.balance = balances[account.pk]
 
     @swagger_helper("Accounts", "Account")
     def perform_update(self, serializer):
-        serializer.save(
-            updated_by=self.request.user.id
-        )
+        new_balance = serializer.validated_data.pop('balance', None)
+        with transaction.atomic():
+            account = serializer.save(
+                updated_by=self.request.user.id
+            )
+            if new_balance is not None:
+                try:
+                    balances = adjust_balance(account, new_balance)
+                except DjangoValidationError as e:
+                    raise serializers.ValidationError(e.messages)
+                account.balance = balances.get(account.pk, new_balance)
+
+    def perform_destroy(self, instance):
+        # The account's ledger goes with it; income and expense entries still using it block the delete
+        try:
+            instance.delete()
+        except ProtectedError:
+            raise serializers.ValidationError("Accounts with income or expense entries cannot be deleted.")
+
+    @action(detail=True, methods=['get'])
+    @conditional_response(Account)
+    def balance(self, request, pk=None):
+        """
+        Balance of the account at the end of ``?as_of=YYYY-MM-DD`` (default today),
+        read from the nearest ledger checkpoint plus the entries after it.
+        """
+        account = self.get_object()
+        try:
+            as_of = date.fromisoformat(request.query_params.get('as_of', timezone.now().date().isoformat()))
+        except ValueError:
+            return Response({'error': "as_of must be a date in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response({
+            'account': account.pk,
+            'as_of': as_of.isoformat(),
+            'balance': str(balance_as_of(account, as_of).quantize(Decimal("0.01"))),
+        })
 
-class BalanceSwitchViewSet(viewsets.ModelViewSet):
+
+class BalanceSwitchViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = BalanceSwitchLogSerializer
-    queryset = BalanceSwitchLog.objects.all()
+    pagination_class = BalanceSwitchCursorPagination
 
-    @swagger_helper("Balance Switch Logs", "Balance Switch Log")
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return BalanceSwitchLog.objects.none()
+        return BalanceSwitchLog.objects.filter(
+            **get_tenant_scope(self.request)
+        ).select_related('from_account', 'to_account')
+
+    @swagger_helper("Balance Switch Logs", "Balance Switch Log", CURSOR_PAGINATION_PARAMS)
+    @conditional_response(BalanceSwitchLog, Account)
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        try:
+            return self.paginated_fast_response(self.filter_queryset(self.get_queryset()))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_helper("Balance Switch Logs", "Balance Switch Log")
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
     @swagger_helper("Balance Switch Logs", "Balance Switch Log")
+    @conditional_response(BalanceSwitchLog, Account)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -76,47 +152,58 @@ class BalanceSwitchViewSet(viewsets.ModelViewSet):
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
 
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream balance switches as CSV (default) or NDJSON (``?format=ndjson``),
+        optionally narrowed by ``year``/``month`` and gzipped with ``?gzip=1``.
+        """
+        try:
+            queryset = filter_by_period(self.get_queryset(), request.query_params, 'switch_date', with_status=False)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return stream_export(
+            queryset.order_by('-switch_date', '-created_at', '-id'),
+            BALANCE_SWITCH_EXPORT_COLUMNS,
+            request.accepted_renderer.format,
+            'balance-switches',
+            gzip=request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes'),
+        )
+
     @swagger_helper("Balance Switch Logs", "Balance Switch Log")
     def perform_create(self, serializer):
         with transaction.atomic():
             from_account = serializer.validated_data['from_account']
-            to_account = serializer.validated_data['to_account']
-            amount = serializer.validated_data['amount']
-            switch_date = serializer.validated_data.get('switch_date', date.today())
-
-            from_account.balance -= amount
-            to_account.balance += amount
-            from_account.save()
-            to_account.save()
-
-            serializer.save()
+            switch = serializer.save(
+                tenant=from_account.tenant,
+                branch=from_account.branch,
+                created_by=self.request.user.id
+            )
+            try:
+                transfer(switch)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError(e.messages)
 
     def perform_update(self, serializer):
         with transaction.atomic():
-            instance = self.get_object()
-            from_account = serializer.validated_data.get('from_account', instance.from_account)
-            to_account = serializer.validated_data.get('to_account', instance.to_account)
-            amount = serializer.validated_data.get('amount', instance.amount)
-
-            # Reverse the original transfer
-            instance.from_account.balance += instance.amount
-            instance.to_account.balance -= instance.amount
-            instance.from_account.save()
-            instance.to_account.save()
-
-            # Apply the new transfer
-            from_account.balance -= amount
-            to_account.balance += amount
-            from_account.save()
-            to_account.save()
-
-            serializer.save()
+            instance = BalanceSwitchLog.objects.select_for_update().get(pk=self.get_object().pk)
+            reversal = switch_postings(instance, sign=-1)
+            switch = serializer.save(
+                updated_by=self.request.user.id
+            )
+
+            # Reverse the original transfer and apply the new one as a single netted posting
+            try:
+                post_balance_changes(reversal + switch_postings(switch))
+            except DjangoValidationError as e:
+                raise serializers.ValidationError(e.messages)
 
     def perform_destroy(self, instance):
         with transaction.atomic():
-            instance.from_account.balance += instance.amount
-            instance.to_account.balance -= instance.amount
-            instance.from_account.save()
-            instance.to_account.save()
+            instance = BalanceSwitchLog.objects.select_for_update().get(pk=instance.pk)
+            try:
+                post_balance_changes(switch_postings(instance, sign=-1))
+            except DjangoValidationError as e:
+                raise serializers.ValidationError(e.messages)
             instance.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ExpenseCategory, Expense
+from .models import ExpenseCategory, Expense, ExpenseRollup
 
 @admin.register(ExpenseCategory)
 class ExpenseCategoryAdmin(admin.ModelAdmin):
@@ -11,4 +11,9 @@ class ExpenseCategoryAdmin(admin.ModelAdmin):
 class ExpenseAdmin(admin.ModelAdmin):
     list_display = ('date', 'category', 'account', 'amount', 'status', 'tenant', 'branch', 'created_at', 'updated_at')
     search_fields = ('reference', 'description')
-    list_filter = ('status', 'tenant', 'branch')
\ No newline at end of file
+    list_filter = ('status', 'tenant', 'branch')
+
+@admin.register(ExpenseRollup)
+class ExpenseRollupAdmin(admin.ModelAdmin):
+    list_display = ('year', 'month', 'account_type', 'category', 'total', 'entry_count', 'tenant', 'branch', 'updated_at')
+    list_filter = ('year', 'account_type', 'tenant', 'branch')
\ No newline at end of file
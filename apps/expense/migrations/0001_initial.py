@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:50
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('requires_approval', models.BooleanField(default=False)),
+                ('approval_threshold', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('tenant', models.UUIDField()),
+                ('branch', models.UUIDField()),
+                ('created_by', models.UUIDField()),
+                ('updated_by', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Expense Category',
+                'verbose_name_plural': 'Expense Categories',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['tenant', 'branch', 'name'], name='expensecat_scope_name_idx')],
+                'unique_together': {('name', 'tenant')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Expense',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('description', models.TextField()),
+                ('reference', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('pending_approval', 'Pending Approval'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('paid', 'Paid'), ('cancelled', 'Cancelled')], default='draft', max_length=20)),
+                ('payment_date', models.DateField(blank=True, null=True)),
+                ('approved_by', models.UUIDField(blank=True, null=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('rejection_reason', models.TextField(blank=True)),
+                ('tenant', models.UUIDField()),
+                ('branch', models.UUIDField()),
+                ('created_by', models.UUIDField()),
+                ('updated_by', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='accounts.account')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='expense.expensecategory')),
+            ],
+            options={
+                'ordering': ['-date', '-created_at'],
+                'indexes': [models.Index(fields=['tenant', 'branch', '-date', '-created_at'], name='expense_scope_date_idx'), models.Index(fields=['tenant', 'branch', 'status', 'date'], name='expense_scope_status_idx'), models.Index(condition=models.Q(('status', 'paid')), fields=['tenant', 'branch', 'date'], name='expense_paid_date_idx')],
+                'unique_together': {('reference', 'tenant', 'branch')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ExpenseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant', models.UUIDField()),
+                ('branch', models.UUIDField()),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('account_type', models.CharField(choices=[('CASH', 'Cash'), ('BANK', 'Bank'), ('DEBT', 'Debt')], max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='expense.expensecategory')),
+            ],
+            options={
+                'verbose_name': 'Expense Monthly Rollup',
+                'verbose_name_plural': 'Expense Monthly Rollups',
+                'ordering': ['-year', '-month'],
+                'unique_together': {('tenant', 'branch', 'year', 'month', 'account_type', 'category')},
+            },
+        ),
+    ]
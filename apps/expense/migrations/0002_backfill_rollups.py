@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Fill the monthly rollups from the paid expenses already in the database,
+    so summaries read the existing history as soon as this is deployed.
+    """
+    Expense = apps.get_model('expense', 'Expense')
+    ExpenseRollup = apps.get_model('expense', 'ExpenseRollup')
+
+    rows = (
+        Expense.objects.filter(status='paid')
+        .annotate(period_year=ExtractYear('date'), period_month=ExtractMonth('date'))
+        .values('tenant', 'branch', 'period_year', 'period_month', 'account__account_type', 'category')
+        .annotate(total=Sum('amount'), entry_count=Count('id'))
+        .order_by()
+    )
+    ExpenseRollup.objects.all().delete()
+    ExpenseRollup.objects.bulk_create([
+        ExpenseRollup(
+            tenant=row['tenant'], branch=row['branch'], year=row['period_year'], month=row['period_month'],
+            account_type=row['account__account_type'], category_id=row['category'],
+            total=row['total'], entry_count=row['entry_count'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
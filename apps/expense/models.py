@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from decimal import Decimal
+from datetime import date
 from apps.accounts.models import Account
+from apps.accounts.services import entry_posting, post_balance_changes
+from apps.reports.services import apply_rollups
 
 
 class ExpenseCategory(models.Model):
@@ -21,6 +25,9 @@ class ExpenseCategory(models.Model):
         verbose_name_plural = 'Expense Categories'
         unique_together = ('name', 'tenant')
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['tenant', 'branch', 'name'], name='expensecat_scope_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -35,6 +42,8 @@ class Expense(models.Model):
         ('paid', 'Paid'),
         ('cancelled', 'Cancelled'),
     )
+    POSTED_STATUS = 'paid'
+    BALANCE_SIGN = -1  # paying an expense debits its account
 
     date = models.DateField()
     category = models.ForeignKey(ExpenseCategory, on_delete=models.PROTECT)
@@ -57,6 +66,11 @@ class Expense(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         unique_together = ('reference', 'tenant', 'branch')
+        indexes = [
+            models.Index(fields=['tenant', 'branch', '-date', '-created_at'], name='expense_scope_date_idx'),
+            models.Index(fields=['tenant', 'branch', 'status', 'date'], name='expense_scope_status_idx'),
+            models.Index(fields=['tenant', 'branch', 'date'], condition=models.Q(status='paid'), name='expense_paid_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.category.name} - {self.amount}"
@@ -64,3 +78,54 @@ class Expense(models.Model):
     def clean(self):
         if self.amount <= 0:
             raise ValidationError("Amount must be positive.")
+
+    def requires_approval(self):
+        threshold = self.category.approval_threshold
+        return self.category.requires_approval and (threshold is None or self.amount > threshold)
+
+    def payment_error(self):
+        if self.status not in ('draft', 'approved'):
+            return "Only draft or approved expenses can be paid."
+        if self.status == 'draft' and self.requires_approval():
+            return "This expense must be approved before it can be paid."
+        return None
+
+    def cancellation_error(self):
+        if self.status in ('rejected', 'cancelled'):
+            return f"{self.get_status_display()} expenses cannot be cancelled."
+        return None
+
+    def pay(self):
+        with transaction.atomic():
+            # Re-read the status under a row lock so concurrent pays cannot both post.
+            self.status = Expense.objects.select_for_update().values_list('status', flat=True).get(pk=self.pk)
+            error = self.payment_error()
+            if error:
+                raise ValidationError(error)
+            balances = post_balance_changes([entry_posting(self)])
+            self.account.balance = balances[self.account_id]
+            self.status = self.POSTED_STATUS
+            self.payment_date = date.today()
+            self.save(update_fields=['status', 'payment_date', 'updated_at'])
+            apply_rollups(ExpenseRollup, [self])
+
+
+class ExpenseRollup(models.Model):
+    tenant = models.UUIDField()
+    branch = models.UUIDField()
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    account_type = models.CharField(max_length=20, choices=Account.ACCOUNT_TYPES)
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal("0"))
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Expense Monthly Rollup'
+        verbose_name_plural = 'Expense Monthly Rollups'
+        unique_together = ('tenant', 'branch', 'year', 'month', 'account_type', 'category')
+        ordering = ['-year', '-month']
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.account_type} - {self.category} - {self.total}"
@@ -1,5 +1,6 @@
 from rest_framework.pagination import PageNumberPagination
 from drf_yasg import openapi
+from config.pagination import KeysetPagination
 
 
 class CustomPagination(PageNumberPagination):
@@ -7,6 +8,10 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class ExpenseCursorPagination(KeysetPagination):
+    whole_days = True
+
+
 PAGINATION_PARAMS = [
     openapi.Parameter(
         'page',
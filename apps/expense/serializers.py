@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from datetime import date
 from .models import Expense, ExpenseCategory
-from apps.accounts.serializers import AccountSerializer
+from apps.accounts.serializers import AccountSerializer, PreloadedPrimaryKeyRelatedField
 
 class ExpenseCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -23,8 +24,29 @@ class ExpenseSerializer(serializers.ModelSerializer):
         extra_kwargs = {'category': {'write_only': True}, 'account': {'write_only': True}}
 
     def validate(self, attrs):
-        if attrs.get('amount') <= 0:
+        tenant = str(self.context['request'].auth['tenant'])
+        branches = [str(branch) for branch in self.context['request'].auth['branches']]
+        for name in ('account', 'category'):
+            related = attrs.get(name)
+            if related is not None and (str(related.tenant) != tenant or str(related.branch) not in branches):
+                raise serializers.ValidationError(f"Selected {name} must belong to the same tenant and branch.")
+
+        def value(name):
+            return attrs[name] if name in attrs else getattr(self.instance, name, None)
+
+        if value('amount') <= 0:
             raise serializers.ValidationError("Amount must be positive.")
-        if attrs.get('date') > date.today():
+        if value('date') > date.today():
             raise serializers.ValidationError("Expense date cannot be in the future.")
-        return attrs
\ No newline at end of file
+        # Saving an expense as paid moves money, so it must pass the same checks as the pay action
+        current_status = getattr(self.instance, 'status', 'draft')
+        if attrs.get('status') == Expense.POSTED_STATUS and current_status != Expense.POSTED_STATUS:
+            error = Expense(category=value('category'), amount=value('amount'), status=current_status).payment_error()
+            if error:
+                raise serializers.ValidationError(error)
+        return attrs
+
+
+class ExpenseBulkSerializer(ExpenseSerializer):
+    category = PreloadedPrimaryKeyRelatedField('categories', write_only=True)
+    account = PreloadedPrimaryKeyRelatedField('accounts', write_only=True)
@@ -0,0 +1,213 @@
+import unittest
+import uuid
+from decimal import Decimal
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import Account, AccountLedgerEntry
+from apps.reports.services import period_bounds, rebuild_rollups
+from apps.testing import QueryPlanAssertions, ScopedTestCase
+from config.serialization import fast_serializer
+from .models import Expense, ExpenseCategory, ExpenseRollup
+from .serializers import ExpenseSerializer
+
+
+class ExpenseTestCase(ScopedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = ExpenseCategory.objects.create(name='Rent', **self.scope)
+        self.account = Account.objects.create(name='Till', account_type='CASH', balance=Decimal("100.00"), **self.scope)
+
+    def create_expenses(self, count, status='paid'):
+        return self.seed_entries(
+            Expense, ExpenseRollup, count, Decimal("1.00"), status, category=self.category, account=self.account
+        )
+
+
+class ExpenseCreateTests(ExpenseTestCase):
+    def create(self, status):
+        return self.client.post('/api/v1/expense/entries/', {
+            'date': self.today.isoformat(), 'category': self.category.pk, 'account': self.account.pk,
+            'amount': '30.00', 'description': 'Rent', 'reference': f'R-{status}', 'status': status,
+        })
+
+    def test_paid_expense_is_posted_to_balance_ledger_and_summary(self):
+        response = self.create('paid')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("70.00"))
+        self.assertTrue(AccountLedgerEntry.objects.filter(source_type='expense', source_id=response.data['id']).exists())
+        summary = self.client.get('/api/v1/expense/entries/summary/', {'year': self.today.year, 'month': self.today.month})
+        self.assertEqual(summary.data['monthly_total'], Decimal("30.00"))
+        self.assertEqual(summary.data['cash_total'], Decimal("30.00"))
+
+    def test_draft_expense_is_not_posted(self):
+        response = self.create('draft')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100.00"))
+        self.assertFalse(ExpenseRollup.objects.filter(tenant=self.tenant).exists())
+
+    def test_paid_expense_over_the_balance_is_rejected(self):
+        self.account.balance = Decimal("10.00")
+        self.account.save()
+
+        response = self.create('paid')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Expense.objects.filter(tenant=self.tenant).exists())
+
+    def test_expense_against_another_tenants_account_is_rejected(self):
+        other = Account.objects.create(
+            name='Other till', account_type='CASH', balance=Decimal("100.00"),
+            tenant=uuid.uuid4(), branch=uuid.uuid4(), created_by=uuid.uuid4(),
+        )
+        self.account = other
+
+        response = self.create('paid')
+
+        self.assertEqual(response.status_code, 400)
+        other.refresh_from_db()
+        self.assertEqual(other.balance, Decimal("100.00"))
+
+    def test_paid_expense_needing_approval_is_rejected(self):
+        self.category.requires_approval = True
+        self.category.save()
+
+        response = self.create('paid')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'], ["This expense must be approved before it can be paid."])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100.00"))
+
+
+
+class ExpenseBulkImportTests(ExpenseTestCase):
+    def import_rows(self, **fields):
+        row = {
+            'date': self.today.isoformat(), 'category': self.category.pk, 'account': self.account.pk,
+            'amount': '30.00', 'description': 'Rent', 'reference': 'R-1', 'status': 'paid', **fields,
+        }
+        return self.client.post('/api/v1/expense/entries/bulk/', [row], format='json')
+
+    def test_paid_row_needing_approval_is_rejected(self):
+        self.category.requires_approval = True
+        self.category.save()
+
+        response = self.import_rows()
+
+        self.assertEqual(response.status_code, 400)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100.00"))
+
+    def test_row_against_another_branchs_account_is_rejected(self):
+        other = Account.objects.create(
+            name='Other till', account_type='CASH', balance=Decimal("100.00"),
+            tenant=self.tenant, branch=uuid.uuid4(), created_by=uuid.uuid4(),
+        )
+
+        response = self.import_rows(account=other.pk)
+
+        self.assertEqual(response.status_code, 400)
+        other.refresh_from_db()
+        self.assertEqual(other.balance, Decimal("100.00"))
+
+
+class RebuildRollupsTests(ExpenseTestCase):
+    def test_rebuild_invalidates_cached_summaries_and_etags(self):
+        params = {'year': self.today.year, 'month': self.today.month}
+        before = self.client.get('/api/v1/expense/entries/summary/', params)
+        self.assertEqual(before.data['monthly_total'], Decimal("0.00"))
+        # Rows written behind the API's back (no signals, no rollups)
+        Expense.objects.bulk_create([Expense(
+            date=self.today, category=self.category, account=self.account, amount=Decimal("12.50"),
+            description='Rent', reference='R-1', status='paid', **self.scope,
+        )])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_rollups(ExpenseRollup, Expense, self.tenant)
+
+        after = self.client.get('/api/v1/expense/entries/summary/', params, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertEqual(after.data['monthly_total'], Decimal("12.50"))
+
+
+class ExpensePeriodParamTests(ExpenseTestCase):
+    def test_bad_period_is_rejected_with_a_readable_message(self):
+        for path, params, message in (
+            ('/api/v1/expense/entries/summary/', {'year': 'abc'}, "year must be an integer."),
+            ('/api/v1/expense/entries/summary/', {'year': '2026', 'month': '13'}, "month must be between 1 and 12."),
+            ('/api/v1/expense/entries/', {'year': '2026', 'month': 'x'}, "month must be an integer."),
+            ('/api/v1/expense/entries/export/', {'year': '0'}, "year must be between 1 and 9998."),
+        ):
+            with self.subTest(path=path, params=params):
+                response = self.client.get(path, params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'error': message})
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class ExpenseSummaryQueryTests(ExpenseTestCase):
+    def assertSummaryQueries(self, params):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/expense/entries/summary/', params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_summary_costs_one_query_however_many_months_have_data(self):
+        monthly, yearly = {'year': self.today.year, 'month': self.today.month}, {'year': self.today.year, 'month': ''}
+        self.assertSummaryQueries(monthly)
+        self.assertSummaryQueries(yearly)
+
+        self.create_expenses(24)
+
+        self.assertSummaryQueries(monthly)
+        response = self.assertSummaryQueries(yearly)
+        self.assertEqual(len(response.data['yearly_data']), self.today.month)
+        self.assertEqual(response.data['yearly_total'], Decimal("24.00"))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite's")
+class ExpenseIndexTests(QueryPlanAssertions, ExpenseTestCase):
+    def test_hot_queries_use_the_scope_indexes(self):
+        scoped = Expense.objects.filter(tenant=self.tenant, branch__in=[self.branch])
+        start, end = period_bounds(self.today.year, self.today.month)
+        indexes = ('expense_scope_date_idx', 'expense_scope_status_idx', 'expense_paid_date_idx')
+
+        self.assertUsesIndex(scoped.order_by('-date', '-created_at', '-id'), 'expense_scope_date_idx')
+        self.assertUsesIndex(scoped.filter(date__gte=start, date__lt=end).order_by('-date', '-created_at', '-id'), 'expense_scope_date_idx')
+        self.assertUsesIndex(scoped.filter(status='paid', date__gte=start, date__lt=end), *indexes)
+        self.assertUsesIndex(scoped.filter(status='draft'), *indexes)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class ExpenseListQueryTests(ExpenseTestCase):
+    def count_queries(self, params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/v1/expense/entries/', params)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_query_count_does_not_grow_with_the_rows_returned(self):
+        for params in ({}, {'year': self.today.year, 'month': self.today.month, 'page_size': 100}, {'year': self.today.year, 'month': ''}):
+            with self.subTest(params=params):
+                Expense.objects.filter(tenant=self.tenant).delete()
+                self.create_expenses(2)
+                few = self.count_queries(params)
+                self.create_expenses(40)
+                self.assertEqual(self.count_queries(params), few)
+
+
+class ExpenseSparseFieldsTests(ExpenseTestCase):
+    def test_field_lists_naming_the_same_fields_share_one_serializer(self):
+        fast = fast_serializer(ExpenseSerializer, ('date', 'amount'))
+
+        self.assertIs(fast_serializer(ExpenseSerializer, ('amount', 'date', 'amount')), fast)
+        self.assertEqual(fast.field_names, ['date', 'amount'])
@@ -2,7 +2,7 @@ from drf_yasg.utils import swagger_auto_schema
 from .pagination import PAGINATION_PARAMS
 
 
-def swagger_helper(tags, model):
+def swagger_helper(tags, model, parameters=PAGINATION_PARAMS):
     def decorators(func):
         descriptions = {
             "list": f"Retrieve a list of {model}",
@@ -14,6 +14,6 @@ def swagger_helper(tags, model):
 
         action_type = func.__name__
         get_description = descriptions.get(action_type, f"{action_type} {model}")
-        return swagger_auto_schema(manual_parameters=PAGINATION_PARAMS, operation_id=f"{action_type} {model}", operation_description=get_description, tags=[tags])(func)
+        return swagger_auto_schema(manual_parameters=parameters, operation_id=f"{action_type} {model}", operation_description=get_description, tags=[tags])(func)
 
     return decorators
\ No newline at end of file
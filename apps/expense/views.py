@@ -1,19 +1,57 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from django.db.models import Sum
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
-from .models import Expense, ExpenseCategory
-from .serializers import ExpenseSerializer, ExpenseCategorySerializer
+from .models import Expense, ExpenseCategory, ExpenseRollup
+from .serializers import ExpenseBulkSerializer, ExpenseSerializer, ExpenseCategorySerializer
 from django.db import transaction
 from datetime import date
+from decimal import Decimal
+from itertools import groupby
 from .utils import swagger_helper
+from apps.accounts.services import (
+    bulk_import_entries, entry_posting, post_balance_changes, save_entry, transition_entries,
+)
+from apps.accounts.utils import filter_by_period, parse_bulk_rows, parse_bulk_selection
+from .pagination import ExpenseCursorPagination
+from apps.reports.services import (
+    ROLLUP_FIELDS, account_type_totals, apply_rollups, build_summary, monthly_totals, parse_period, parse_year_month,
+    period_bounds,
+)
+from apps.accounts.models import Account
+from apps.reports.exports import EXPENSE_EXPORT_COLUMNS
+from config.authentication import get_tenant_scope
+from config.cache import cached_response, conditional_response
+from config.export import stream_export
+from config.pagination import CURSOR_PAGINATION_PARAMS
+from config.parsers import FastJSONParser
+from config.renderers import CSVRenderer, NDJSONRenderer
+from config.serialization import SparseFieldsMixin
+
+
+def group_serialized(instances, data, key):
+    """
+    Walk instances (or raw ``values()`` rows) alongside their already-serialized
+    rows, yielding ``(key, instances, rows)`` for each run of consecutive equal keys.
+    """
+    for group_key, pairs in groupby(zip(instances, data), key=lambda pair: key(pair[0])):
+        pairs = list(pairs)
+        yield group_key, [instance for instance, _ in pairs], [row for _, row in pairs]
+
 
 class ExpenseCategoryViewSet(viewsets.ModelViewSet):
     serializer_class = ExpenseCategorySerializer
-    queryset = ExpenseCategory.objects.all()
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return ExpenseCategory.objects.none()
+        return ExpenseCategory.objects.filter(**get_tenant_scope(self.request))
 
     @swagger_helper("Expense Categories", "Expense Category")
+    @conditional_response(ExpenseCategory)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -22,6 +60,7 @@ class ExpenseCategoryViewSet(viewsets.ModelViewSet):
         return super().create(request, *args, **kwargs)
 
     @swagger_helper("Expense Categories", "Expense Category")
+    @conditional_response(ExpenseCategory)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -29,19 +68,21 @@ class ExpenseCategoryViewSet(viewsets.ModelViewSet):
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = ExpenseSerializer
-    queryset = Expense.objects.all()
+    pagination_class = ExpenseCursorPagination
 
-    @swagger_helper("Expenses", "Expense")
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Expense.objects.none()
+        return Expense.objects.filter(**get_tenant_scope(self.request)).select_related('category', 'account')
 
     @swagger_helper("Expenses", "Expense")
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
     @swagger_helper("Expenses", "Expense")
+    @conditional_response(Expense, ExpenseCategory, Account)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -51,26 +92,36 @@ class ExpenseViewSet(viewsets.ModelViewSet):
 
     @swagger_helper("Expenses", "Expense")
     def perform_create(self, serializer):
-        serializer.save(
-            tenant=self.request.auth['tenant'],
-            branch=self.request.auth['branches'][0],
-            created_by=self.request.user.id
-        )
+        try:
+            save_entry(
+                serializer, ExpenseRollup,
+                tenant=self.request.auth['tenant'],
+                branch=self.request.auth['branches'][0],
+                created_by=self.request.user.id
+            )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
 
     @swagger_helper("Expenses", "Expense")
     def perform_update(self, serializer):
         instance = self.get_object()
         if instance.status not in ['draft', 'pending_approval']:
             raise serializers.ValidationError("Only draft or pending_approval expenses can be updated.")
-        serializer.save(
-            updated_by=self.request.user.id
-        )
+        try:
+            save_entry(serializer, ExpenseRollup, updated_by=self.request.user.id)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
 
     def perform_destroy(self, instance):
-        if instance.status == 'paid':
-            instance.account.balance += instance.amount
-            instance.account.save()
-        instance.delete()
+        with transaction.atomic():
+            instance.status = Expense.objects.select_for_update().values_list('status', flat=True).get(pk=instance.pk)
+            if instance.status == Expense.POSTED_STATUS:
+                try:
+                    post_balance_changes([entry_posting(instance, sign=-1)])
+                except DjangoValidationError as e:
+                    raise serializers.ValidationError(e.messages)
+                apply_rollups(ExpenseRollup, [instance], sign=-1)
+            instance.delete()
 
     @action(detail=True, methods=['post'])
     def pay(self, request, pk=None):
@@ -81,115 +132,171 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='bulk-pay')
+    def bulk_pay(self, request):
+        """
+        Pay many expenses at once, selected by ``ids`` or a ``filter``.
+        """
+        return self._bulk_transition(request, Expense.POSTED_STATUS, Expense.payment_error, {'payment_date': date.today()})
+
+    @action(detail=False, methods=['post'], url_path='bulk-cancel')
+    def bulk_cancel(self, request):
+        """
+        Cancel many expenses at once, reversing the payment of paid ones.
+        """
+        return self._bulk_transition(request, 'cancelled', Expense.cancellation_error)
+
+    def _bulk_transition(self, request, to_status, check, updates=None):
+        try:
+            ids = parse_bulk_selection(request.data, self.get_queryset())
+            results = transition_entries(self.get_queryset(), ids, to_status, check, ExpenseRollup, updates)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'succeeded': sum(error is None for error in results.values()),
+            'failed': sum(error is not None for error in results.values()),
+            'results': [
+                {'id': pk, 'status': to_status} if error is None else {'id': pk, 'error': error}
+                for pk, error in results.items()
+            ],
+        })
+
+    @action(detail=False, methods=['post'], parser_classes=[FastJSONParser, MultiPartParser, FormParser])
+    def bulk(self, request):
+        """
+        Import a JSON array or CSV upload of entries in one request.
+        Pass ``?dry_run=true`` to validate without writing.
+        """
+        try:
+            rows = parse_bulk_rows(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        save_kwargs = {
+            'tenant': request.auth['tenant'],
+            'branch': request.auth['branches'][0],
+            'created_by': request.user.id,
+        }
+        try:
+            result = bulk_import_entries(
+                ExpenseBulkSerializer, ExpenseRollup, rows, self.get_serializer_context(), save_kwargs, dry_run=dry_run
+            )
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if result['errors']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream expenses as CSV (default) or NDJSON (``?format=ndjson``),
+        optionally narrowed by ``year``/``month``/``status`` and gzipped with ``?gzip=1``.
+        """
+        try:
+            queryset = filter_by_period(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return stream_export(
+            queryset.order_by('-date', '-created_at', '-id'),
+            EXPENSE_EXPORT_COLUMNS,
+            request.accepted_renderer.format,
+            'expenses',
+            gzip=request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes'),
+        )
+
     @action(detail=False, methods=['get'])
+    @conditional_response(Expense, Account)
+    @cached_response('expense-summary')
     def summary(self, request):
-        queryset = self.get_queryset().filter(status='paid')
         today = timezone.now().date()
-        year = request.query_params.get('year', today.year)
-        month = request.query_params.get('month', today.month)
-
-        filtered = queryset.filter(date__year=year, date__month=month)
-        monthly_total = filtered.aggregate(Sum('amount'))['amount__sum'] or 0.0
-        cash_total = filtered.filter(account__account_type='CASH').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        bank_total = filtered.filter(account__account_type='BANK').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        debt_total = filtered.filter(account__account_type='DEBT').aggregate(Sum('amount'))['amount__sum'] or 0.0
+        try:
+            year, month = parse_period(request.query_params, today)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        response_data = {
-            'monthly_total': float(monthly_total),
-            'cash_total': float(cash_total),
-            'bank_total': float(bank_total),
-            'debt_total': float(debt_total),
-        }
+        queryset = ExpenseRollup.objects.filter(**get_tenant_scope(request), year=year)
+        if month:
+            queryset = queryset.filter(month=month)
 
-        if year and not month:
-            yearly_data = []
-            for m in range(1, 13):
-                monthly_expenses = queryset.filter(date__year=year, date__month=m)
-                if monthly_expenses.exists():
-                    yearly_data.append({
-                        'month': f"{year}-{m:02d}",
-                        'total': float(monthly_expenses.aggregate(Sum('amount'))['amount__sum'] or 0.0),
-                    })
-            response_data['yearly_data'] = yearly_data
-            response_data['yearly_total'] = float(queryset.filter(date__year=year).aggregate(Sum('amount'))['amount__sum'] or 0.0)
-
-        return Response(response_data)
+        return Response(build_summary(queryset, year, month, today, **ROLLUP_FIELDS))
 
+    @swagger_helper("Expenses", "Expense", CURSOR_PAGINATION_PARAMS)
+    @conditional_response(Expense, ExpenseCategory, Account)
+    @cached_response('expense-list')
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         year = request.query_params.get('year', None)
         month = request.query_params.get('month', None)
         today = timezone.now().date()
 
+        try:
+            parsed_year, month = parse_year_month(year or today.year, month)
+            year = parsed_year if year else None
+            start, end = period_bounds(year or today.year, month or today.month)
+            fast = self.get_fast_serializer()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         filtered = queryset
-        monthly_total = filtered.filter(date__month=today.month, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        cash_total = filtered.filter(account__account_type='CASH', date__month=today.month, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        bank_total = filtered.filter(account__account_type='BANK', date__month=today.month, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        debt_total = filtered.filter(account__account_type='DEBT', date__month=today.month, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0.0
+        current_month = ExpenseRollup.objects.filter(**get_tenant_scope(request), year=today.year, month=today.month)
+        totals = account_type_totals(monthly_totals(current_month, **ROLLUP_FIELDS).get(today.month))
 
         if year and not month:
+            year_start, year_end = period_bounds(year)
+            yearly_expenses = list(fast.values(
+                filtered.filter(date__gte=year_start, date__lt=year_end, status='paid'), 'date', 'amount'
+            ))
+            entries = self.serialize_rows(fast, yearly_expenses)
             yearly_data = []
-            for m in range(1, 13):
-                monthly_expenses = filtered.filter(date__year=year, date__month=m, status='paid')
-                if monthly_expenses.exists():
-                    entries = self.get_serializer(monthly_expenses, many=True).data
-                    total_for_the_month = monthly_expenses.aggregate(Sum('amount'))['amount__sum'] or 0.0
-                    yearly_data.append({
-                        'month': f"{year}-{m:02d}",
-                        'entries': entries,
-                        'total_for_the_month': float(total_for_the_month),
-                    })
-            yearly_total = filtered.filter(date__year=year, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0.0
+            yearly_total = Decimal("0")
+            for m, group, group_entries in reversed(list(group_serialized(yearly_expenses, entries, lambda e: e['date'].month))):
+                total_for_the_month = sum(e['amount'] for e in group)
+                yearly_total += total_for_the_month
+                yearly_data.append({
+                    'month': f"{year}-{m:02d}",
+                    'entries': group_entries,
+                    'total_for_the_month': total_for_the_month,
+                })
             response_data = {
-                'monthly_total': float(monthly_total),
-                'cash_total': float(cash_total),
-                'bank_total': float(bank_total),
-                'debt_total': float(debt_total),
+                **totals,
                 'yearly_data': yearly_data,
-                'yearly_total': float(yearly_total),
+                'yearly_total': yearly_total,
+            }
+            return Response(self.with_field_names(fast, response_data))
+
+        filtered = self.paginate_queryset(
+            fast.values(filtered.filter(date__gte=start, date__lt=end), *self.paginator.key_fields, 'amount')
+        )
+        entries = self.serialize_rows(fast, filtered)
+        daily_data = [
+            {
+                'date': expense_date,
+                'entries': group_entries,
+                'daily_total': sum((e['amount'] for e in group), Decimal("0")),
             }
-            return Response(response_data)
-
-        if year is None and month is None:
-            filtered = filtered.filter(date__year=today.year, date__month=today.month)
-        if year is None and month is not None:
-            filtered = filtered.filter(date__year=today.year, date__month=month)
-
-        daily_data = []
-        current_date = None
-        daily_expenses = []
-        for expense in filtered:
-            expense_date = expense.date
-            if expense_date != current_date:
-                if daily_expenses:
-                    daily_data.append({
-                        'date': current_date,
-                        'entries': self.get_serializer(daily_expenses, many=True).data,
-                        'daily_total': float(sum(e.amount for e in daily_expenses)),
-                    })
-                current_date = expense_date
-                daily_expenses = [expense]
-            else:
-                daily_expenses.append(expense)
-        if daily_expenses:
-            daily_data.append({
-                'date': current_date,
-                'entries': self.get_serializer(daily_expenses, many=True).data,
-                'daily_total': float(sum(e.amount for e in daily_expenses)),
-            })
+            for expense_date, group, group_entries in group_serialized(filtered, entries, lambda e: e['date'])
+        ]
 
         response_data = {
-            'monthly_total': float(monthly_total),
-            'cash_total': float(cash_total),
-            'bank_total': float(bank_total),
-            'debt_total': float(debt_total),
+            **totals,
+            'next': self.paginator.get_next_link(),
             'daily_data': daily_data,
         }
         if year:
-            yearly_total = filtered.filter(date__year=year, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0.0
-            response_data['yearly_total'] = float(yearly_total)
+            year_start, year_end = period_bounds(year)
+            yearly_total = queryset.filter(
+                date__gte=year_start, date__lt=year_end, status='paid'
+            ).aggregate(Sum('amount'))['amount__sum'] or Decimal("0.00")
+            response_data['yearly_total'] = yearly_total
 
-        return Response(response_data)
+        return Response(self.with_field_names(fast, response_data))
 
     @swagger_helper("Expenses", "Expense")
     def destroy(self, request, *args, **kwargs):
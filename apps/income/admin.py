@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import IncomeCategory, Income
+from .models import IncomeCategory, Income, IncomeRollup
 
 @admin.register(IncomeCategory)
 class IncomeCategoryAdmin(admin.ModelAdmin):
@@ -11,4 +11,9 @@ class IncomeCategoryAdmin(admin.ModelAdmin):
 class IncomeAdmin(admin.ModelAdmin):
     list_display = ('date', 'category', 'account', 'amount', 'status', 'tenant', 'branch', 'created_at', 'updated_at')
     search_fields = ('reference', 'description')
-    list_filter = ('status', 'tenant', 'branch')
\ No newline at end of file
+    list_filter = ('status', 'tenant', 'branch')
+
+@admin.register(IncomeRollup)
+class IncomeRollupAdmin(admin.ModelAdmin):
+    list_display = ('year', 'month', 'account_type', 'category', 'total', 'entry_count', 'tenant', 'branch', 'updated_at')
+    list_filter = ('year', 'account_type', 'tenant', 'branch')
\ No newline at end of file
@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from decimal import Decimal
 from apps.accounts.models import Account
+from apps.accounts.services import entry_posting, post_balance_changes
+from apps.reports.services import apply_rollups
 
 
 class IncomeCategory(models.Model):
@@ -18,6 +21,9 @@ class IncomeCategory(models.Model):
         verbose_name_plural = 'Income Categories'
         unique_together = ('name', 'tenant')
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['tenant', 'branch', 'name'], name='incomecat_scope_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -29,6 +35,8 @@ class Income(models.Model):
         ('confirmed', 'Confirmed'),
         ('cancelled', 'Cancelled'),
     )
+    POSTED_STATUS = 'confirmed'
+    BALANCE_SIGN = 1  # confirming income credits its account
 
     date = models.DateField()
     category = models.ForeignKey(IncomeCategory, on_delete=models.PROTECT)
@@ -47,6 +55,11 @@ class Income(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         unique_together = ('reference', 'tenant', 'branch')
+        indexes = [
+            models.Index(fields=['tenant', 'branch', '-date', '-created_at'], name='income_scope_date_idx'),
+            models.Index(fields=['tenant', 'branch', 'status', 'date'], name='income_scope_status_idx'),
+            models.Index(fields=['tenant', 'branch', 'date'], condition=models.Q(status='confirmed'), name='income_confirmed_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.category.name} - {self.amount} to {self.account.name}"
@@ -57,10 +70,46 @@ class Income(models.Model):
         if self.amount <= 0:
             raise ValidationError("Amount must be positive.")
 
-    def confirm(self):
+    def confirmation_error(self):
         if self.status != 'draft':
-            raise ValidationError("Only draft income entries can be confirmed.")
-        self.status = 'confirmed'
-        self.account.balance += self.amount
-        self.account.save()
-        self.save()
+            return "Only draft income entries can be confirmed."
+        return None
+
+    def cancellation_error(self):
+        if self.status == 'cancelled':
+            return "Income entry is already cancelled."
+        return None
+
+    def confirm(self):
+        with transaction.atomic():
+            # Re-read the status under a row lock so concurrent confirms cannot both post.
+            self.status = Income.objects.select_for_update().values_list('status', flat=True).get(pk=self.pk)
+            error = self.confirmation_error()
+            if error:
+                raise ValidationError(error)
+            balances = post_balance_changes([entry_posting(self)])
+            self.account.balance = balances[self.account_id]
+            self.status = self.POSTED_STATUS
+            self.save(update_fields=['status', 'updated_at'])
+            apply_rollups(IncomeRollup, [self])
+
+
+class IncomeRollup(models.Model):
+    tenant = models.UUIDField()
+    branch = models.UUIDField()
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    account_type = models.CharField(max_length=20, choices=Account.ACCOUNT_TYPES)
+    category = models.ForeignKey(IncomeCategory, on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal("0"))
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Income Monthly Rollup'
+        verbose_name_plural = 'Income Monthly Rollups'
+        unique_together = ('tenant', 'branch', 'year', 'month', 'account_type', 'category')
+        ordering = ['-year', '-month']
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.account_type} - {self.category} - {self.total}"
@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from datetime import date
 from .models import Income, IncomeCategory
 from apps.accounts.models import Account
+from apps.accounts.serializers import PreloadedPrimaryKeyRelatedField
 
 
 class IncomeCategorySerializer(serializers.ModelSerializer):
@@ -21,13 +23,18 @@ class IncomeSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         account = attrs.get('account')
-        tenant = self.context['request'].tenant_id
-        branch = self.context['request'].branch_id
+        tenant = str(self.context['request'].auth['tenant'])
+        branches = [str(branch) for branch in self.context['request'].auth['branches']]
 
-        if account.tenant != tenant or account.branch != branch:
+        if str(account.tenant) != tenant or str(account.branch) not in branches:
             raise serializers.ValidationError("Selected account must belong to the same tenant and branch.")
         if attrs.get('amount') <= 0:
             raise serializers.ValidationError("Amount must be positive.")
         if attrs.get('date') > date.today():
             raise serializers.ValidationError("Income date cannot be in the future.")
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class IncomeBulkSerializer(IncomeSerializer):
+    category = PreloadedPrimaryKeyRelatedField('categories')
+    account = PreloadedPrimaryKeyRelatedField('accounts')
@@ -0,0 +1,88 @@
+import unittest
+import uuid
+from decimal import Decimal
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import Account
+from apps.reports.services import period_bounds
+from apps.testing import QueryPlanAssertions, ScopedTestCase
+from .models import Income, IncomeCategory, IncomeRollup
+
+
+class IncomeTestCase(ScopedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = IncomeCategory.objects.create(name='Sales', **self.scope)
+        self.account = Account.objects.create(name='Bank', account_type='BANK', **self.scope)
+
+    def create_incomes(self, count, status='confirmed'):
+        return self.seed_entries(
+            Income, IncomeRollup, count, Decimal("2.00"), status, category=self.category, account=self.account
+        )
+
+
+class IncomeBulkImportTests(IncomeTestCase):
+    def test_row_against_another_branchs_category_is_rejected(self):
+        other = IncomeCategory.objects.create(name='Rentals', tenant=self.tenant, branch=uuid.uuid4(), created_by=uuid.uuid4())
+
+        response = self.client.post('/api/v1/income/entries/bulk/', [{
+            'date': self.today.isoformat(), 'category': other.pk, 'account': self.account.pk,
+            'amount': '30.00', 'description': 'Sale', 'reference': 'S-1', 'status': 'confirmed',
+        }], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Income.objects.filter(tenant=self.tenant).exists())
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class IncomeSummaryQueryTests(IncomeTestCase):
+    def assertSummaryQueries(self, params):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/income/entries/summary/', params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_summary_costs_one_query_however_many_months_have_data(self):
+        monthly, yearly = {'year': self.today.year, 'month': self.today.month}, {'year': self.today.year, 'month': ''}
+        self.assertSummaryQueries(monthly)
+        self.assertSummaryQueries(yearly)
+
+        self.create_incomes(24)
+
+        self.assertSummaryQueries(monthly)
+        response = self.assertSummaryQueries(yearly)
+        self.assertEqual(len(response.data['yearly_data']), self.today.month)
+        self.assertEqual(response.data['yearly_total'], Decimal("48.00"))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite's")
+class IncomeIndexTests(QueryPlanAssertions, IncomeTestCase):
+    def test_hot_queries_use_the_scope_indexes(self):
+        scoped = Income.objects.filter(tenant=self.tenant, branch__in=[self.branch])
+        start, end = period_bounds(self.today.year)
+        indexes = ('income_scope_date_idx', 'income_scope_status_idx', 'income_confirmed_date_idx')
+
+        self.assertUsesIndex(scoped.order_by('-date', '-created_at', '-id'), 'income_scope_date_idx')
+        self.assertUsesIndex(scoped.filter(status='confirmed', date__gte=start, date__lt=end), *indexes)
+        self.assertUsesIndex(scoped.filter(status='draft'), *indexes)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class IncomeListQueryTests(IncomeTestCase):
+    def count_queries(self, params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/v1/income/entries/', params)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_query_count_does_not_grow_with_the_rows_returned(self):
+        for params in ({}, {'page_size': 100}, {'fields': 'id,amount,category_name'}):
+            with self.subTest(params=params):
+                Income.objects.filter(tenant=self.tenant).delete()
+                self.create_incomes(2)
+                few = self.count_queries(params)
+                self.create_incomes(40)
+                self.assertEqual(self.count_queries(params), few)
@@ -1,15 +1,41 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
-from django.db.models import Sum
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
-from .models import Income, IncomeCategory
-from .serializers import IncomeSerializer, IncomeCategorySerializer
+from django.db import transaction
+from .models import Income, IncomeCategory, IncomeRollup
+from .serializers import IncomeBulkSerializer, IncomeSerializer, IncomeCategorySerializer
 from rest_framework import serializers
 from .utils import swagger_helper
+from apps.accounts.services import (
+    bulk_import_entries, entry_posting, post_balance_changes, save_entry, transition_entries,
+)
+from apps.accounts.utils import filter_by_period, parse_bulk_rows, parse_bulk_selection
+from .pagination import IncomeCursorPagination
+from apps.reports.services import ROLLUP_FIELDS, apply_rollups, build_summary, parse_period
+from apps.accounts.models import Account
+from apps.reports.exports import INCOME_EXPORT_COLUMNS
+from config.authentication import get_tenant_scope
+from config.cache import cached_response, conditional_response
+from config.export import stream_export
+from config.pagination import CURSOR_PAGINATION_PARAMS
+from config.parsers import FastJSONParser
+from config.renderers import CSVRenderer, NDJSONRenderer
+from config.serialization import SparseFieldsMixin
+
 
 class IncomeCategoryViewSet(viewsets.ModelViewSet):
+    serializer_class = IncomeCategorySerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return IncomeCategory.objects.none()
+        return IncomeCategory.objects.filter(**get_tenant_scope(self.request))
+
     @swagger_helper("Income Categories", "Income Category")
+    @conditional_response(IncomeCategory)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -18,6 +44,7 @@ class IncomeCategoryViewSet(viewsets.ModelViewSet):
         return super().create(request, *args, **kwargs)
 
     @swagger_helper("Income Categories", "Income Category")
+    @conditional_response(IncomeCategory)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -25,16 +52,30 @@ class IncomeCategoryViewSet(viewsets.ModelViewSet):
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
 
-class IncomeViewSet(viewsets.ModelViewSet):
-    @swagger_helper("Incomes", "Income")
+class IncomeViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
+    serializer_class = IncomeSerializer
+    pagination_class = IncomeCursorPagination
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Income.objects.none()
+        return Income.objects.filter(**get_tenant_scope(self.request)).select_related('category', 'account')
+
+    @swagger_helper("Incomes", "Income", CURSOR_PAGINATION_PARAMS)
+    @conditional_response(Income, IncomeCategory, Account)
+    @cached_response('income-list')
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        try:
+            return self.paginated_fast_response(self.filter_queryset(self.get_queryset()))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_helper("Incomes", "Income")
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
     @swagger_helper("Incomes", "Income")
+    @conditional_response(Income, IncomeCategory, Account)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -44,20 +85,36 @@ class IncomeViewSet(viewsets.ModelViewSet):
 
     @swagger_helper("Incomes", "Income")
     def perform_create(self, serializer):
-        serializer.save()
+        try:
+            save_entry(
+                serializer, IncomeRollup,
+                tenant=self.request.auth['tenant'],
+                branch=self.request.auth['branches'][0],
+                created_by=self.request.user.id
+            )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
 
     @swagger_helper("Incomes", "Income")
     def perform_update(self, serializer):
         instance = self.get_object()
         if instance.status != 'draft':
             raise serializers.ValidationError("Only draft income entries can be updated.")
-        serializer.save()
+        try:
+            save_entry(serializer, IncomeRollup)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
 
     def perform_destroy(self, instance):
-        if instance.status == 'confirmed':
-            instance.account.balance -= instance.amount
-            instance.account.save()
-        instance.delete()
+        with transaction.atomic():
+            instance.status = Income.objects.select_for_update().values_list('status', flat=True).get(pk=instance.pk)
+            if instance.status == Income.POSTED_STATUS:
+                try:
+                    post_balance_changes([entry_posting(instance, sign=-1)])
+                except DjangoValidationError as e:
+                    raise serializers.ValidationError(e.messages)
+                apply_rollups(IncomeRollup, [instance], sign=-1)
+            instance.delete()
 
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
@@ -68,39 +125,100 @@ class IncomeViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='bulk-confirm')
+    def bulk_confirm(self, request):
+        """
+        Confirm many income entries at once, selected by ``ids`` or a ``filter``.
+        """
+        return self._bulk_transition(request, Income.POSTED_STATUS, Income.confirmation_error)
+
+    @action(detail=False, methods=['post'], url_path='bulk-cancel')
+    def bulk_cancel(self, request):
+        """
+        Cancel many income entries at once, reversing confirmed ones.
+        """
+        return self._bulk_transition(request, 'cancelled', Income.cancellation_error)
+
+    def _bulk_transition(self, request, to_status, check, updates=None):
+        try:
+            ids = parse_bulk_selection(request.data, self.get_queryset())
+            results = transition_entries(self.get_queryset(), ids, to_status, check, IncomeRollup, updates)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'succeeded': sum(error is None for error in results.values()),
+            'failed': sum(error is not None for error in results.values()),
+            'results': [
+                {'id': pk, 'status': to_status} if error is None else {'id': pk, 'error': error}
+                for pk, error in results.items()
+            ],
+        })
+
+    @action(detail=False, methods=['post'], parser_classes=[FastJSONParser, MultiPartParser, FormParser])
+    def bulk(self, request):
+        """
+        Import a JSON array or CSV upload of entries in one request.
+        Pass ``?dry_run=true`` to validate without writing.
+        """
+        try:
+            rows = parse_bulk_rows(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        save_kwargs = {
+            'tenant': request.auth['tenant'],
+            'branch': request.auth['branches'][0],
+            'created_by': request.user.id,
+        }
+        try:
+            result = bulk_import_entries(
+                IncomeBulkSerializer, IncomeRollup, rows, self.get_serializer_context(), save_kwargs, dry_run=dry_run
+            )
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if result['errors']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream income entries as CSV (default) or NDJSON (``?format=ndjson``),
+        optionally narrowed by ``year``/``month``/``status`` and gzipped with ``?gzip=1``.
+        """
+        try:
+            queryset = filter_by_period(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return stream_export(
+            queryset.order_by('-date', '-created_at', '-id'),
+            INCOME_EXPORT_COLUMNS,
+            request.accepted_renderer.format,
+            'incomes',
+            gzip=request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes'),
+        )
+
     @action(detail=False, methods=['get'])
+    @conditional_response(Income, Account)
+    @cached_response('income-summary')
     def summary(self, request):
-        queryset = self.get_queryset().filter(status='confirmed')
         today = timezone.now().date()
-        year = request.query_params.get('year', today.year)
-        month = request.query_params.get('month', today.month)
-
-        filtered = queryset.filter(date__year=year, date__month=month)
-        monthly_total = filtered.aggregate(Sum('amount'))['amount__sum'] or 0.0
-        cash_total = filtered.filter(account__account_type='CASH').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        bank_total = filtered.filter(account__account_type='BANK').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        debt_total = filtered.filter(account__account_type='DEBT').aggregate(Sum('amount'))['amount__sum'] or 0.0
-
-        response_data = {
-            'monthly_total': float(monthly_total),
-            'cash_total': float(cash_total),
-            'bank_total': float(bank_total),
-            'debt_total': float(debt_total),
-        }
+        try:
+            year, month = parse_period(request.query_params, today)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = IncomeRollup.objects.filter(**get_tenant_scope(request), year=year)
+        if month:
+            queryset = queryset.filter(month=month)
 
-        if year and not month:
-            yearly_data = []
-            for m in range(1, 13):
-                monthly_income = queryset.filter(date__year=year, date__month=m)
-                if monthly_income.exists():
-                    yearly_data.append({
-                        'month': f"{year}-{m:02d}",
-                        'total': float(monthly_income.aggregate(Sum('amount'))['amount__sum'] or 0.0),
-                    })
-            response_data['yearly_data'] = yearly_data
-            response_data['yearly_total'] = float(queryset.filter(date__year=year).aggregate(Sum('amount'))['amount__sum'] or 0.0)
-
-        return Response(response_data)
+        return Response(build_summary(queryset, year, month, today, **ROLLUP_FIELDS))
 
     @swagger_helper("Incomes", "Income")
     def destroy(self, request, *args, **kwargs):
@@ -0,0 +1 @@
+default_app_config = 'apps.outbox.apps.OutboxConfig'
\ No newline at end of file
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import OutboxEvent
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event_type', 'tenant', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('event_type', 'status', 'tenant')
+    readonly_fields = ('created_at', 'sent_at')
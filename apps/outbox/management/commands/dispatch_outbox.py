@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outbox.models import OutboxEvent
+from apps.outbox.services import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox events to OUTBOX_EVENTS_URL, once or continuously."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Events per request (default OUTBOX_BATCH_SIZE).")
+        parser.add_argument('--loop', action='store_true', help="Keep dispatching until interrupted.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between passes with --loop.")
+        parser.add_argument(
+            '--requeue-failed', action='store_true',
+            help="Move failed events back to pending first. A tenant's later events were delivered while these "
+                 "were failed, so they now arrive after them; consumers must order a tenant's events by id.",
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            count = OutboxEvent.objects.filter(status='failed').update(status='pending', attempts=0, next_attempt_at=None)
+            self.stdout.write(f"Requeued {count} failed event(s); they are delivered after any later events already sent.")
+
+        while True:
+            stats = dispatch_pending(batch_size=options['batch_size'])
+            self.stdout.write(f"sent={stats['sent']} retrying={stats['retrying']} failed={stats['failed']}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
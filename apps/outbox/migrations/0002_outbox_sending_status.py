@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_outbox_event'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxevent',
+            name='outbox_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'sending'])), fields=['tenant', 'id'], name='outbox_undelivered_idx'),
+        ),
+    ]
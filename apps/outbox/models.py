@@ -0,0 +1,39 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    A finance event waiting to be published to the other microservices.
+    Written in the same transaction as the change it describes, so an event
+    exists exactly when that change committed.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    tenant = models.UUIDField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['tenant', 'id'], name='outbox_undelivered_idx', condition=models.Q(status__in=['pending', 'sending'])
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk} ({self.status})"
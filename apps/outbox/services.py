@@ -0,0 +1,158 @@
+import logging
+import threading
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 3600
+
+# Statuses of events that still have to reach OUTBOX_EVENTS_URL
+UNDELIVERED = ('pending', 'sending')
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def record_events(events):
+    """
+    Queue ``(event_type, tenant, payload)`` events for publishing. Call it
+    inside the transaction that makes the change, so the events commit or
+    roll back with it.
+    """
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, tenant=tenant, payload=payload)
+        for event_type, tenant, payload in events
+    ], batch_size=500)
+
+
+def get_session():
+    """
+    Process-wide ``requests.Session`` so deliveries reuse pooled keep-alive
+    connections. Connection errors are retried at the transport level; HTTP
+    errors are left to the outbox retry schedule.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['Content-Type'] = 'application/json'
+            _session = session
+        return _session
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def envelope(event):
+    return {
+        'id': event.pk,
+        'type': event.event_type,
+        'tenant': str(event.tenant),
+        'created_at': event.created_at.isoformat(),
+        'data': event.payload,
+    }
+
+
+def dispatch_pending(batch_size=None, url=None):
+    """
+    Deliver pending events to ``OUTBOX_EVENTS_URL`` in batches, tenant by
+    tenant and in id order within a tenant.
+
+    Each batch is POSTed as ``{"events": [...]}``. A batch is claimed by
+    moving it to ``sending`` in a short transaction and POSTed after that
+    commits, so no row lock is held over the network. A tenant whose oldest
+    undelivered event is locked, being sent or waiting for a retry is
+    skipped, so concurrent dispatchers never deliver one tenant's events out
+    of order, and a failed batch holds back that tenant's later events until
+    it is retried with exponential backoff. Events still failing after
+    ``OUTBOX_MAX_ATTEMPTS`` are marked failed and no longer hold anything
+    back. Returns delivery counts.
+    """
+    url = url or settings.OUTBOX_EVENTS_URL
+    stats = {'sent': 0, 'retrying': 0, 'failed': 0}
+    if not url:
+        logger.debug("OUTBOX_EVENTS_URL is not set, leaving events pending")
+        return stats
+
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    tenants = OutboxEvent.objects.filter(status__in=UNDELIVERED).order_by().values_list('tenant', flat=True).distinct()
+    for tenant in list(tenants):
+        while _dispatch_batch(tenant, url, batch_size, stats) == batch_size:
+            pass
+    return stats
+
+
+def _claim_batch(tenant, batch_size):
+    """
+    Move up to ``batch_size`` of the tenant's events, starting at its oldest
+    undelivered one, to ``sending`` and return them. Returns ``[]`` when that
+    oldest event is not due or another dispatcher holds it. A ``sending``
+    batch whose ``OUTBOX_SEND_LEASE`` ran out (its dispatcher died) is due
+    again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        head = OutboxEvent.objects.filter(tenant=tenant, status__in=UNDELIVERED).order_by('id').first()
+        if head is None or (head.next_attempt_at and head.next_attempt_at > now):
+            return []
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(tenant=tenant, status__in=UNDELIVERED, id__gte=head.pk)
+            .order_by('id')[:batch_size]
+        )
+        if not events or events[0].pk != head.pk:
+            return []
+        # Stop at an event that is not due, so the batch stays contiguous
+        due = len(events)
+        for n, event in enumerate(events):
+            if event.next_attempt_at and event.next_attempt_at > now:
+                due = n
+                break
+        events = events[:due]
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            status='sending', next_attempt_at=now + timedelta(seconds=settings.OUTBOX_SEND_LEASE)
+        )
+    return events
+
+
+def _dispatch_batch(tenant, url, batch_size, stats):
+    events = _claim_batch(tenant, batch_size)
+    if not events:
+        return 0
+    ids = [event.pk for event in events]
+    attempts = events[0].attempts + 1
+    claimed = OutboxEvent.objects.filter(pk__in=ids, status='sending')
+
+    try:
+        response = get_session().post(
+            url, json={'events': [envelope(event) for event in events]}, timeout=settings.OUTBOX_TIMEOUT
+        )
+        response.raise_for_status()
+    except requests.RequestException as e:
+        failed = attempts >= settings.OUTBOX_MAX_ATTEMPTS
+        logger.warning("outbox batch %s-%s for tenant %s failed (attempt %s): %s", ids[0], ids[-1], tenant, attempts, e)
+        claimed.update(
+            attempts=attempts,
+            status='failed' if failed else 'pending',
+            next_attempt_at=None if failed else timezone.now() + retry_delay(attempts),
+            last_error=str(e)[:1000],
+        )
+        stats['failed' if failed else 'retrying'] += len(ids)
+        return 0
+
+    claimed.update(status='sent', sent_at=timezone.now(), next_attempt_at=None, attempts=attempts, last_error='')
+    stats['sent'] += len(ids)
+    return len(ids)
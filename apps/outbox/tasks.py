@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .services import dispatch_pending
+
+
+@shared_task
+def dispatch_outbox():
+    return dispatch_pending()
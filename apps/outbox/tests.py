@@ -0,0 +1,111 @@
+import json
+import threading
+import uuid
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import OutboxEvent
+from .services import dispatch_pending, record_events
+
+
+class StubEventsServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the service at OUTBOX_EVENTS_URL. Records every POSTed
+    batch and answers with the next status in ``statuses`` (then 200).
+    """
+    def __init__(self, statuses=()):
+        super().__init__(('127.0.0.1', 0), StubEventsHandler)
+        self.statuses = list(statuses)
+        self.batches = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/events"
+
+
+class StubEventsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.batches.append(json.loads(body)['events'])
+        self.send_response(self.server.statuses.pop(0) if self.server.statuses else 200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2)
+class DispatchPendingTests(TestCase):
+    def setUp(self):
+        self.tenant = uuid.uuid4()
+
+    def start_server(self, statuses=()):
+        server = StubEventsServer(statuses)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def record(self, count, tenant=None):
+        record_events(('ledger.posted', tenant or self.tenant, {'n': n}) for n in range(count))
+
+    def test_events_are_posted_in_id_order_in_batches(self):
+        server = self.start_server()
+        self.record(5)
+
+        stats = dispatch_pending(batch_size=2, url=server.url)
+
+        self.assertEqual(stats, {'sent': 5, 'retrying': 0, 'failed': 0})
+        self.assertEqual([[event['data']['n'] for event in batch] for batch in server.batches], [[0, 1], [2, 3], [4]])
+        self.assertFalse(OutboxEvent.objects.exclude(status='sent').exists())
+
+    def test_failed_batch_holds_back_the_tenants_later_events(self):
+        server = self.start_server(statuses=[503])
+        self.record(3)
+        other = uuid.uuid4()
+        self.record(1, tenant=other)
+
+        with self.assertLogs('apps.outbox.services', 'WARNING'):
+            stats = dispatch_pending(batch_size=2, url=server.url)
+
+        self.assertEqual(stats, {'sent': 1, 'retrying': 2, 'failed': 0})
+        self.assertEqual(OutboxEvent.objects.filter(tenant=self.tenant, status='pending').count(), 3)
+        self.assertEqual(OutboxEvent.objects.get(tenant=other).status, 'sent')
+
+        # Not due again until the backoff has passed
+        dispatch_pending(batch_size=2, url=server.url)
+        self.assertEqual(len(server.batches), 2)
+
+        OutboxEvent.objects.filter(tenant=self.tenant).update(next_attempt_at=timezone.now())
+        self.assertEqual(dispatch_pending(batch_size=2, url=server.url)['sent'], 3)
+        self.assertEqual([[event['data']['n'] for event in batch] for batch in server.batches[2:]], [[0, 1], [2]])
+
+    def test_batch_failing_every_attempt_is_marked_failed(self):
+        server = self.start_server(statuses=[500, 500])
+        self.record(1)
+
+        with self.assertLogs('apps.outbox.services', 'WARNING'):
+            dispatch_pending(url=server.url)
+            OutboxEvent.objects.update(next_attempt_at=timezone.now())
+            stats = dispatch_pending(url=server.url)
+
+        self.assertEqual(stats, {'sent': 0, 'retrying': 0, 'failed': 1})
+        self.assertEqual(OutboxEvent.objects.get().status, 'failed')
+
+    def test_tenant_is_skipped_while_another_dispatcher_sends_its_oldest_event(self):
+        server = self.start_server()
+        self.record(3)
+        oldest = OutboxEvent.objects.order_by('id').first()
+        OutboxEvent.objects.filter(pk=oldest.pk).update(status='sending', next_attempt_at=timezone.now() + timedelta(seconds=60))
+
+        self.assertEqual(dispatch_pending(url=server.url)['sent'], 0)
+        self.assertEqual(server.batches, [])
+
+        # Once the claim's lease runs out the batch is taken over, oldest event first
+        OutboxEvent.objects.filter(pk=oldest.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(dispatch_pending(url=server.url)['sent'], 3)
+        self.assertEqual([event['id'] for event in server.batches[0]], sorted(event['id'] for event in server.batches[0]))
+        self.assertEqual(server.batches[0][0]['id'], oldest.pk)
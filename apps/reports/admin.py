@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import ReportJob
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'report_type', 'export_format', 'status', 'size', 'tenant', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('report_type', 'status', 'tenant')
+    readonly_fields = ('started_at', 'finished_at')
@@ -0,0 +1,41 @@
+from django.utils import timezone
+
+from apps.expense.models import ExpenseRollup
+from apps.income.models import IncomeRollup
+from config.authentication import get_tenant_scope
+from config.concurrency import async_api_view, run_concurrently
+from .dashboard import abuild_dashboard, summary_query
+from .services import parse_period
+
+# Async variants of the summary and dashboard endpoints, for deployments under
+# ASGI (config.asgi). They take the same query params and return the same
+# payloads as their DRF counterparts. The default middleware stack runs
+# natively under ASGI, so a request takes executor threads only while its
+# queries run, all at the same time (see run_concurrently). QueryTimingMiddleware
+# and ProfilingMiddleware are sync-only and, when switched on, hold a thread
+# for the whole request.
+
+
+def _period(request):
+    today = timezone.now().date()
+    return (*parse_period(request.GET, today), today)
+
+
+@async_api_view
+async def dashboard(request):
+    year, month, today = _period(request)
+    return await abuild_dashboard(get_tenant_scope(request), year, month, today)
+
+
+@async_api_view
+async def expense_summary(request):
+    year, month, today = _period(request)
+    summary, = await run_concurrently(summary_query(ExpenseRollup, get_tenant_scope(request), year, month, today))
+    return summary
+
+
+@async_api_view
+async def income_summary(request):
+    year, month, today = _period(request)
+    summary, = await run_concurrently(summary_query(IncomeRollup, get_tenant_scope(request), year, month, today))
+    return summary
@@ -0,0 +1,442 @@
+import json
+import random
+import resource
+import statistics
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import requests
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import Account, AccountLedgerEntry, BalanceSwitchLog
+from apps.expense.models import Expense, ExpenseCategory, ExpenseRollup
+from apps.income.models import Income, IncomeCategory, IncomeRollup
+from config.authentication import CustomJWTAuthentication, _token_cache, _token_cache_lock
+from config.renderers import JSON_BACKENDS, ExactDecimalJSONEncoder, dumps, orjson
+from config.serialization import fast_serializer
+from .services import rebuild_rollups
+
+
+SEED_NAMESPACE = uuid.UUID('5b0c7f52-4a4e-4f0e-9a55-3f1d2c6b8e01')
+BATCH_SIZE = 1000
+
+EXPENSE_STATUSES = (('paid', 60), ('draft', 15), ('pending_approval', 10), ('approved', 10), ('cancelled', 5))
+INCOME_STATUSES = (('confirmed', 70), ('draft', 20), ('cancelled', 10))
+
+
+def seed_uuid(*parts):
+    return uuid.uuid5(SEED_NAMESPACE, '/'.join(str(part) for part in parts))
+
+
+def seed_tenant(index):
+    return seed_uuid('tenant', index)
+
+
+def seed_branch(tenant_index):
+    return seed_uuid('branch', tenant_index)
+
+
+def _weighted(rng, choices):
+    return rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+
+def seed_finance(tenants, accounts, entries, days=730, end=None, seed=0, clear=False):
+    """
+    Generate ``tenants`` x ``accounts`` x ``entries`` deterministically: every
+    account gets ``entries`` rows split between expenses and incomes over the
+    ``days`` before ``end``, plus a few balance switches. Balances, the
+    ledger and the monthly rollups are kept consistent with the entries.
+    Returns row counts.
+    """
+    end = end or date.today()
+    counts = {'accounts': 0, 'expenses': 0, 'incomes': 0, 'balance_switches': 0}
+
+    for tenant_index in range(tenants):
+        rng = random.Random(f"{seed}/{tenant_index}")
+        tenant, branch, user = seed_tenant(tenant_index), seed_branch(tenant_index), seed_uuid('user', tenant_index)
+        scope = {'tenant': tenant, 'branch': branch, 'created_by': user}
+
+        with transaction.atomic():
+            if clear:
+                clear_tenant(tenant)
+
+            expense_categories = ExpenseCategory.objects.bulk_create([
+                ExpenseCategory(name=f"Expense {n}", **scope) for n in range(8)
+            ])
+            income_categories = IncomeCategory.objects.bulk_create([
+                IncomeCategory(name=f"Income {n}", **scope) for n in range(5)
+            ])
+            tenant_accounts = Account.objects.bulk_create([
+                Account(name=f"Account {n}", account_type=Account.ACCOUNT_TYPES[n % 3][0], **scope)
+                for n in range(accounts)
+            ])
+
+            expenses, incomes, switches, ledger = [], [], [], []
+            balances = {account.pk: Decimal("0") for account in tenant_accounts}
+            for account in tenant_accounts:
+                for n in range(entries):
+                    entry_date = end - timedelta(days=rng.randrange(days))
+                    amount = Decimal(rng.randrange(100, 500000)) / 100
+                    fields = {
+                        'date': entry_date, 'account': account, 'amount': amount, 'description': f"Seeded entry {n}",
+                        'reference': f"S{account.pk}-{n}", **scope,
+                    }
+                    if n % 2:
+                        entry = Income(category=rng.choice(income_categories), status=_weighted(rng, INCOME_STATUSES), **fields)
+                        incomes.append(entry)
+                    else:
+                        entry = Expense(category=rng.choice(expense_categories), status=_weighted(rng, EXPENSE_STATUSES), **fields)
+                        expenses.append(entry)
+
+            for n in range(accounts * max(entries // 20, 1) if accounts > 1 else 0):
+                from_account, to_account = rng.sample(tenant_accounts, 2)
+                switches.append(BalanceSwitchLog(
+                    from_account=from_account, to_account=to_account,
+                    amount=Decimal(rng.randrange(100, 100000)) / 100,
+                    switch_date=end - timedelta(days=rng.randrange(days)), **scope,
+                ))
+
+            expenses = Expense.objects.bulk_create(expenses, batch_size=BATCH_SIZE)
+            incomes = Income.objects.bulk_create(incomes, batch_size=BATCH_SIZE)
+            switches = BalanceSwitchLog.objects.bulk_create(switches, batch_size=BATCH_SIZE)
+
+            def post(account_id, amount, effective_date, source_type, source_id):
+                balances[account_id] += amount
+                ledger.append(AccountLedgerEntry(
+                    account_id=account_id, amount=amount, effective_date=effective_date,
+                    source_type=source_type, source_id=source_id, tenant=tenant, branch=branch,
+                ))
+
+            for entry in expenses + incomes:
+                if entry.status == entry.POSTED_STATUS:
+                    post(entry.account_id, entry.BALANCE_SIGN * entry.amount, entry.date, entry._meta.model_name, entry.pk)
+            for switch in switches:
+                post(switch.from_account_id, -switch.amount, switch.switch_date, 'balance_switch', switch.pk)
+                post(switch.to_account_id, switch.amount, switch.switch_date, 'balance_switch', switch.pk)
+
+            # Open every account with enough to keep its running balance non-negative
+            opening_date = end - timedelta(days=days)
+            for account in tenant_accounts:
+                opening = max(-balances[account.pk], Decimal("0")) + Decimal(rng.randrange(1000, 1000000)) / 100
+                post(account.pk, opening, opening_date, 'opening', None)
+                account.balance = balances[account.pk]
+            Account.objects.bulk_update(tenant_accounts, ['balance'], batch_size=BATCH_SIZE)
+            AccountLedgerEntry.objects.bulk_create(ledger, batch_size=BATCH_SIZE)
+
+            rebuild_rollups(ExpenseRollup, Expense, tenant)
+            rebuild_rollups(IncomeRollup, Income, tenant)
+
+        counts['accounts'] += len(tenant_accounts)
+        counts['expenses'] += len(expenses)
+        counts['incomes'] += len(incomes)
+        counts['balance_switches'] += len(switches)
+    return counts
+
+
+def clear_tenant(tenant):
+    ExpenseRollup.objects.filter(tenant=tenant).delete()
+    IncomeRollup.objects.filter(tenant=tenant).delete()
+    Expense.objects.filter(tenant=tenant).delete()
+    Income.objects.filter(tenant=tenant).delete()
+    AccountLedgerEntry.objects.filter(tenant=tenant).delete()
+    BalanceSwitchLog.objects.filter(tenant=tenant).delete()
+    Account.objects.filter(tenant=tenant).delete()
+    ExpenseCategory.objects.filter(tenant=tenant).delete()
+    IncomeCategory.objects.filter(tenant=tenant).delete()
+
+
+def seed_export_rows(rows, seed=0, end=None):
+    """
+    Give a dedicated tenant exactly ``rows`` draft expenses for the export
+    benchmark, inserted in batches of ``BATCH_SIZE`` so memory stays flat.
+    Drafts touch no balance, ledger or rollup. Existing rows are reused when
+    the count already matches. Returns the tenant's claims scope.
+    """
+    end = end or date.today()
+    tenant, branch, user = seed_uuid('export-tenant'), seed_uuid('export-branch'), seed_uuid('export-user')
+    scope = {'tenant': tenant, 'branch': branch, 'created_by': user}
+    if Expense.objects.filter(tenant=tenant).count() == rows:
+        return scope
+
+    rng = random.Random(f"{seed}/export")
+    with transaction.atomic():
+        clear_tenant(tenant)
+        category = ExpenseCategory.objects.create(name="Export", **scope)
+        account = Account.objects.create(name="Export", account_type='BANK', **scope)
+        for start in range(0, rows, BATCH_SIZE):
+            Expense.objects.bulk_create([
+                Expense(
+                    date=end - timedelta(days=rng.randrange(365)), category=category, account=account,
+                    amount=Decimal(rng.randrange(100, 500000)) / 100, description=f"Export entry {n}",
+                    reference=f"E-{n}", status='draft', **scope,
+                )
+                for n in range(start, min(start + BATCH_SIZE, rows))
+            ])
+    return scope
+
+
+def _rss_mb():
+    """
+    Current resident set size of this process in MB, from ``/proc`` (Linux); None elsewhere.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 1e6
+    except OSError:
+        return None
+
+
+def run_export_benchmark(client, exports):
+    """
+    Stream every ``(name, path, params)`` export once, reading (and inflating)
+    the body the way a client would, and report rows, bytes sent, wall time and
+    rows per second. The peak growth of the process' RSS while streaming (sampled
+    from ``/proc``) shows whether memory stayed flat.
+    """
+    results = {}
+    for name, path, params in exports:
+        rss_before = rss_peak = _rss_mb()
+        started = time.perf_counter()
+        response = client.get(path, params)
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if params.get('gzip') else None
+        size, lines = 0, 0
+        for index, chunk in enumerate(response.streaming_content if response.streaming else [response.content]):
+            size += len(chunk)
+            lines += (decompressor.decompress(chunk) if decompressor else chunk).count(b'\n')
+            if rss_before is not None and index % 20 == 0:
+                rss_peak = max(rss_peak, _rss_mb())
+        elapsed = time.perf_counter() - started
+        # CSV starts with a header line
+        rows = lines - (params.get('format') != 'ndjson')
+        results[name] = {
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'rows': rows,
+            'mb': round(size / 1e6, 2),
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed) if rows else None,
+            'peak_rss_growth_mb': round(rss_peak - rss_before, 1) if rss_before is not None else None,
+        }
+    return results
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def rows_scanned(queries):
+    """
+    Rows read by the plan nodes of the captured SELECTs, from PostgreSQL's
+    ``EXPLAIN (ANALYZE, FORMAT JSON)``. None on other databases.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+
+    def scanned(plan):
+        rows = plan.get('Actual Rows', 0) * plan.get('Actual Loops', 1) if 'Scan' in plan['Node Type'] else 0
+        return rows + sum(scanned(child) for child in plan.get('Plans', []))
+
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            if query['sql'].lstrip().upper().startswith('SELECT'):
+                cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query['sql']}")
+                plan = cursor.fetchone()[0]
+                total += scanned((json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan'])
+    return total
+
+
+def run_benchmark(client, endpoints, iterations=20, warmup=3):
+    """
+    Request every ``(name, path, params)`` endpoint ``warmup + iterations``
+    times and report latency percentiles in milliseconds, queries per
+    request and rows scanned per request.
+    """
+    results = {}
+    for name, path, params in endpoints:
+        timings, queries = [], None
+        for iteration in range(warmup + iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, params)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                elapsed = (time.perf_counter() - started) * 1000
+            if iteration >= warmup:
+                timings.append(elapsed)
+                queries = captured.captured_queries
+        results[name] = {
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'queries': len(queries),
+            'rows_scanned': rows_scanned(queries),
+        }
+    return results
+
+
+def compare_serializers(cases, iterations=5):
+    """
+    Time ``ModelSerializer(many=True)`` against the ``fast_serializer`` path for
+    every ``(name, serializer_class, queryset)`` case, including the fetch, and
+    check that both render to the same JSON bytes. Reports rows per second.
+    """
+    renderer = JSONRenderer()
+    results = {}
+    for name, serializer_class, queryset in cases:
+        fast = fast_serializer(serializer_class)
+        timings = {'model_serializer': [], 'fast_serializer': []}
+        for _ in range(iterations):
+            started = time.perf_counter()
+            slow_rows = serializer_class(list(queryset.all()), many=True).data
+            timings['model_serializer'].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            fast_rows = fast.many(fast.values(queryset.all()))
+            timings['fast_serializer'].append(time.perf_counter() - started)
+
+        rows = len(fast_rows)
+        result = {'rows': rows, 'identical': renderer.render(slow_rows) == renderer.render(fast_rows)}
+        for key, values in timings.items():
+            result[f'{key}_rows_per_sec'] = round(rows / statistics.median(values)) if rows else None
+        if rows:
+            result['speedup'] = round(result['fast_serializer_rows_per_sec'] / result['model_serializer_rows_per_sec'], 2)
+        results[name] = result
+    return results
+
+
+def compare_json_backends(data, iterations=50):
+    """
+    Encode ``data`` (a response payload) with every installed JSON backend,
+    with Decimals as floats and as exact strings, and report encodes and MB
+    per second plus whether each backend's bytes match the stdlib's.
+    """
+    backends = [backend for backend in JSON_BACKENDS if backend != 'orjson' or orjson is not None]
+    results = {}
+    for decimals, encoder_class in (('float', None), ('exact', ExactDecimalJSONEncoder)):
+        encoder_kwargs = {'encoder_class': encoder_class} if encoder_class else {}
+        reference = dumps(data, backend='json', **encoder_kwargs)
+        for backend in backends:
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                content = dumps(data, backend=backend, **encoder_kwargs)
+                timings.append(time.perf_counter() - started)
+            elapsed = statistics.median(timings)
+            results[f'{backend}-{decimals}'] = {
+                'bytes': len(content),
+                'identical': content == reference,
+                'encodes_per_sec': round(1 / elapsed, 1),
+                'mb_per_sec': round(len(content) / elapsed / 1e6, 2),
+            }
+    return results
+
+
+def signed_token(claims):
+    """
+    A real HS256 access token carrying ``claims``, signed with ``SIMPLE_JWT``'s key.
+    Every call gets a new ``jti``, so no two tokens share a cache entry.
+    """
+    token = AccessToken()
+    for claim, value in claims.items():
+        token[claim] = value
+    return str(token)
+
+
+def _clear_token_cache():
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
+def compare_auth(client, claims, path, iterations=1000, requests_iterations=50):
+    """
+    Time ``CustomJWTAuthentication`` on real signed tokens, in microseconds per
+    authentication: ``uncached`` verifies every token as before the token
+    cache, ``cold`` sends a new token each time (cache misses) and ``warm``
+    repeats one token (cache hits). The ``request_*`` cases send the same
+    tokens through the whole stack to ``path`` and report milliseconds per
+    request.
+    """
+    factory = APIRequestFactory()
+    authentication = CustomJWTAuthentication()
+    tokens = [signed_token(claims) for _ in range(iterations)]
+    auth_requests = [factory.get(path, HTTP_AUTHORIZATION=f"JWT {token}") for token in tokens]
+
+    def timed(authenticate, requests_to_send):
+        started = time.perf_counter()
+        for request in requests_to_send:
+            authenticate(request)
+        return (time.perf_counter() - started) / len(requests_to_send)
+
+    results = {}
+    _clear_token_cache()
+    results['uncached_us'] = round(timed(lambda request: JWTAuthentication.authenticate(authentication, request), auth_requests) * 1e6, 2)
+    results['cold_us'] = round(timed(authentication.authenticate, auth_requests) * 1e6, 2)
+    results['warm_us'] = round(timed(authentication.authenticate, [auth_requests[0]] * iterations) * 1e6, 2)
+
+    def timed_requests(tokens_to_send):
+        started = time.perf_counter()
+        for token in tokens_to_send:
+            response = client.get(path, HTTP_AUTHORIZATION=f"JWT {token}")
+            if response.status_code != 200:
+                raise ValueError(f"{path} answered {response.status_code} to a signed token.")
+        return (time.perf_counter() - started) / len(tokens_to_send)
+
+    _clear_token_cache()
+    results['request_cold_ms'] = round(timed_requests(tokens[:requests_iterations]) * 1000, 3)
+    results['request_warm_ms'] = round(timed_requests([tokens[0]] * requests_iterations) * 1000, 3)
+    results['request_saving_ms'] = round(results['request_cold_ms'] - results['request_warm_ms'], 3)
+    return results
+
+
+def run_http_benchmark(base_url, endpoints, headers, total=200, concurrency=8, warmup=5):
+    """
+    Send ``total`` GETs to every ``(name, path, params)`` endpoint of a running
+    server from ``concurrency`` client threads and report latency percentiles
+    in milliseconds and throughput.
+    """
+    local = threading.local()
+
+    def get(path, params):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+            session.headers.update(headers)
+        started = time.perf_counter()
+        response = session.get(base_url + path, params=params, timeout=60)
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, path, params in endpoints:
+            list(pool.map(lambda _: get(path, params), range(warmup)))
+            started = time.perf_counter()
+            responses = list(pool.map(lambda _: get(path, params), range(total)))
+            elapsed = time.perf_counter() - started
+            timings = [timing for _, timing in responses]
+            results[name] = {
+                'path': path,
+                'statuses': sorted({status for status, _ in responses}),
+                'p50_ms': round(percentile(timings, 0.5), 3),
+                'p95_ms': round(percentile(timings, 0.95), 3),
+                'mean_ms': round(statistics.fmean(timings), 3),
+                'requests_per_sec': round(total / elapsed, 1),
+            }
+    return results
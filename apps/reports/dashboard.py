@@ -0,0 +1,54 @@
+from functools import partial
+
+from apps.accounts.models import Account
+from apps.expense.models import Expense, ExpenseRollup
+from apps.income.models import Income, IncomeRollup
+from config.concurrency import run_concurrently
+from .services import ROLLUP_FIELDS, build_summary, cash_flow, period_bounds
+
+
+def _summary(rollup_model, scope, year, month, today):
+    queryset = rollup_model.objects.filter(**scope, year=year)
+    if month:
+        queryset = queryset.filter(month=month)
+    return build_summary(queryset, year, month, today, **ROLLUP_FIELDS)
+
+
+def _accounts(scope):
+    return list(Account.objects.filter(**scope).order_by('name').values('id', 'name', 'account_type', 'balance'))
+
+
+def _cash_flow(scope, year, month):
+    start, end = period_bounds(year, month)
+    period = {**scope, 'date__gte': start, 'date__lt': end}
+    return cash_flow(Income.objects.filter(**period), Expense.objects.filter(**period), 'day' if month else 'month')
+
+
+def summary_query(rollup_model, scope, year, month, today):
+    return partial(_summary, rollup_model, scope, year, month, today)
+
+
+def dashboard_queries(scope, year, month, today):
+    """
+    The dashboard's parts as independent zero-argument callables: the expense
+    and income summaries, account balances and the period's cash flow.
+    """
+    return {
+        'expense_summary': summary_query(ExpenseRollup, scope, year, month, today),
+        'income_summary': summary_query(IncomeRollup, scope, year, month, today),
+        'accounts': partial(_accounts, scope),
+        'cash_flow': partial(_cash_flow, scope, year, month),
+    }
+
+
+def build_dashboard(scope, year, month, today):
+    return {name: query() for name, query in dashboard_queries(scope, year, month, today).items()}
+
+
+async def abuild_dashboard(scope, year, month, today):
+    """
+    ``build_dashboard`` with every part's queries running at the same time on
+    separate connections, so it takes about as long as the slowest part.
+    """
+    queries = dashboard_queries(scope, year, month, today)
+    return dict(zip(queries, await run_concurrently(*queries.values())))
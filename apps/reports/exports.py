@@ -0,0 +1,24 @@
+# Export column name -> values_list lookup, shared by the streaming export
+# endpoints and the report jobs that build the same files in the background
+
+EXPENSE_EXPORT_COLUMNS = {
+    'id': 'id', 'date': 'date', 'category': 'category_id', 'category_name': 'category__name',
+    'account': 'account_id', 'account_name': 'account__name', 'amount': 'amount',
+    'description': 'description', 'reference': 'reference', 'status': 'status',
+    'payment_date': 'payment_date', 'approved_by': 'approved_by', 'approved_at': 'approved_at',
+    'rejection_reason': 'rejection_reason', 'created_by': 'created_by', 'created_at': 'created_at',
+}
+
+INCOME_EXPORT_COLUMNS = {
+    'id': 'id', 'date': 'date', 'category': 'category_id', 'category_name': 'category__name',
+    'account': 'account_id', 'account_name': 'account__name', 'amount': 'amount',
+    'description': 'description', 'reference': 'reference', 'status': 'status',
+    'created_by': 'created_by', 'created_at': 'created_at',
+}
+
+BALANCE_SWITCH_EXPORT_COLUMNS = {
+    'id': 'id', 'switch_date': 'switch_date', 'from_account': 'from_account_id',
+    'from_account_name': 'from_account__name', 'to_account': 'to_account_id',
+    'to_account_name': 'to_account__name', 'amount': 'amount', 'created_by': 'created_by',
+    'created_at': 'created_at',
+}
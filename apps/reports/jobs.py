@@ -0,0 +1,61 @@
+from django.utils import timezone
+
+from apps.accounts.models import BalanceSwitchLog
+from apps.accounts.utils import filter_by_period
+from apps.expense.models import Expense
+from apps.income.models import Income
+from config.export import EXPORT_CONTENT_TYPES, export_chunks
+from config.renderers import dumps
+from .exports import BALANCE_SWITCH_EXPORT_COLUMNS, EXPENSE_EXPORT_COLUMNS, INCOME_EXPORT_COLUMNS
+from .services import CASH_FLOW_BUCKETS, cash_flow, parse_date_range
+
+
+CONTENT_TYPES = {**EXPORT_CONTENT_TYPES, 'json': 'application/json'}
+
+
+def _export(model, columns, date_field='date', with_status=True):
+    def prepare(job):
+        queryset = model.objects.filter(tenant=job.tenant, branch__in=job.branches)
+        queryset = filter_by_period(queryset, job.params, date_field, with_status)
+        return lambda: export_chunks(
+            queryset.order_by(f'-{date_field}', '-created_at', '-id'), columns, job.export_format
+        )
+    return prepare
+
+
+def _cash_flow(job):
+    start, end = parse_date_range(job.params, timezone.now().date())
+    bucket = job.params.get('bucket', 'month')
+    if bucket not in CASH_FLOW_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(CASH_FLOW_BUCKETS)}.")
+    by_category = str(job.params.get('by_category', '')).lower() in ('1', 'true', 'yes')
+    scope = {'tenant': job.tenant, 'branch__in': job.branches, 'date__gte': start, 'date__lte': end}
+
+    def build():
+        data = cash_flow(Income.objects.filter(**scope), Expense.objects.filter(**scope), bucket, by_category)
+        # Same encoding as the API's cash-flow response
+        yield dumps({'start': start.isoformat(), 'end': end.isoformat(), **data})
+    return build
+
+
+# report_type -> (supported formats, prepare(job) returning a chunk generator factory)
+REPORTS = {
+    'expenses': (('csv', 'ndjson'), _export(Expense, EXPENSE_EXPORT_COLUMNS)),
+    'incomes': (('csv', 'ndjson'), _export(Income, INCOME_EXPORT_COLUMNS)),
+    'balance_switches': (('csv', 'ndjson'), _export(BalanceSwitchLog, BALANCE_SWITCH_EXPORT_COLUMNS, 'switch_date', False)),
+    'cash_flow': (('json',), _cash_flow),
+}
+
+
+def prepare_report(job):
+    """
+    Validate ``job``'s type, format and params without touching the database
+    and return a callable producing the report's encoded chunks. Raises ValueError.
+    """
+    formats, prepare = REPORTS[job.report_type]
+    if job.export_format not in formats:
+        raise ValueError(f"{job.report_type} reports support: {', '.join(formats)}.")
+    try:
+        return prepare(job)
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e) or "Invalid report params.")
@@ -0,0 +1,121 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import Account
+from apps.reports.benchmark import run_http_benchmark, seed_branch, seed_tenant, seed_uuid
+
+
+def endpoint_pairs(today):
+    """
+    ``(name, path, params)`` for every sync endpoint followed by its async variant.
+    """
+    year, month = str(today.year), str(today.month)
+    return [
+        ('dashboard', '/api/v1/reports/dashboard/', {'year': year, 'month': month}),
+        ('dashboard-async', '/api/v1/reports/async/dashboard/', {'year': year, 'month': month}),
+        ('dashboard-yearly', '/api/v1/reports/dashboard/', {'year': year, 'month': ''}),
+        ('dashboard-yearly-async', '/api/v1/reports/async/dashboard/', {'year': year, 'month': ''}),
+        ('expense-summary', '/api/v1/expense/entries/summary/', {'year': year, 'month': ''}),
+        ('expense-summary-async', '/api/v1/reports/async/expense-summary/', {'year': year, 'month': ''}),
+        ('income-summary', '/api/v1/income/entries/summary/', {'year': year, 'month': ''}),
+        ('income-summary-async', '/api/v1/reports/async/income-summary/', {'year': year, 'month': ''}),
+    ]
+
+
+def wait_for_port(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Start config.asgi under uvicorn with several workers and compare the sync summary/dashboard "
+        "endpoints with their async variants over HTTP. Prints latency and throughput as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant-index', type=int, default=0, help="Seeded tenant to query (see seed_finance).")
+        parser.add_argument('--workers', type=int, default=4, help="uvicorn worker processes.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Concurrent client connections.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--only', nargs='+', help="Endpoint names to run.")
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise CommandError("uvicorn is not installed.")
+        if settings.DATABASES['default']['NAME'] == ':memory:':
+            raise CommandError("The uvicorn workers need a shared database; an in-memory SQLite database is not.")
+
+        tenant, branch = seed_tenant(options['tenant_index']), seed_branch(options['tenant_index'])
+        if not Account.objects.filter(tenant=tenant).exists():
+            raise CommandError(f"Tenant {tenant} has no data; run seed_finance first.")
+
+        token = AccessToken()
+        token['user_id'] = str(seed_uuid('user', options['tenant_index']))
+        token['tenant'] = str(tenant)
+        token['branches'] = [str(branch)]
+
+        endpoints = endpoint_pairs(date.today())
+        if options['only']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint[0] in options['only']]
+
+        host, port = options['host'], options['port']
+        # Measure the queries themselves, not the response cache
+        env = {**os.environ, 'RESPONSE_CACHE_TIMEOUT': '0'}
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'config.asgi:application', '--host', host, '--port', str(port),
+             '--workers', str(options['workers']), '--log-level', 'warning', '--no-access-log'],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        try:
+            if not wait_for_port(host, port, timeout=30):
+                raise CommandError(f"uvicorn did not start listening on {host}:{port}.")
+            results = run_http_benchmark(
+                f"http://{host}:{port}", endpoints, {'Authorization': f"{settings.SIMPLE_JWT['AUTH_HEADER_TYPES'][0]} {token}"},
+                options['requests'], options['concurrency'],
+            )
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        for name, result in results.items():
+            sync = results.get(name.removesuffix('-async')) if name.endswith('-async') else None
+            if sync and sync['p50_ms']:
+                result['p50_change'] = round(result['p50_ms'] / sync['p50_ms'] - 1, 3)
+                result['p95_change'] = round(result['p95_ms'] / sync['p95_ms'] - 1, 3)
+
+        report = {
+            'meta': {
+                'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+                'tenant': str(tenant),
+                'workers': options['workers'],
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+            },
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
+        self.stdout.write(output)
@@ -0,0 +1,135 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.models import Account, BalanceSwitchLog
+from apps.accounts.serializers import BalanceSwitchLogSerializer
+from apps.expense.models import Expense
+from apps.expense.serializers import ExpenseSerializer
+from apps.income.models import Income
+from apps.income.serializers import IncomeSerializer
+from apps.reports.benchmark import (
+    compare_auth, compare_json_backends, compare_serializers, run_benchmark, run_export_benchmark, seed_branch, seed_export_rows, seed_tenant,
+    seed_uuid,
+)
+from config.authentication import CustomTokenUser
+
+
+def default_endpoints(account_id, today):
+    year, month = str(today.year), str(today.month)
+    return [
+        ('expense-list', '/api/v1/expense/entries/', {'year': year, 'month': month}),
+        ('expense-list-yearly', '/api/v1/expense/entries/', {'year': year, 'month': ''}),
+        ('expense-summary', '/api/v1/expense/entries/summary/', {'year': year, 'month': ''}),
+        ('income-list', '/api/v1/income/entries/', {}),
+        ('income-summary', '/api/v1/income/entries/summary/', {'year': year, 'month': ''}),
+        ('account-list', '/api/v1/accounts/accounts/', {}),
+        ('account-balance-as-of', f'/api/v1/accounts/accounts/{account_id}/balance/', {'as_of': f"{today.year}-01-01"}),
+        ('balance-switch-list', '/api/v1/accounts/balance-switches/', {}),
+        ('cash-flow-monthly', '/api/v1/reports/cash-flow/', {'start': f"{today.year - 1}-01-01", 'end': today.isoformat()}),
+        ('cash-flow-daily-by-category', '/api/v1/reports/cash-flow/', {'bucket': 'day', 'by_category': '1'}),
+        ('expense-export-csv', '/api/v1/expense/entries/export/', {'year': year}),
+    ]
+
+
+def export_endpoints():
+    path = '/api/v1/expense/entries/export/'
+    return [
+        ('expense-export-csv', path, {}),
+        ('expense-export-ndjson', path, {'format': 'ndjson'}),
+        ('expense-export-csv-gzip', path, {'gzip': '1'}),
+    ]
+
+
+def serializer_cases(tenant):
+    return [
+        ('expense', ExpenseSerializer, Expense.objects.filter(tenant=tenant).select_related('category', 'account')),
+        ('income', IncomeSerializer, Income.objects.filter(tenant=tenant).select_related('category', 'account')),
+        ('balance-switch', BalanceSwitchLogSerializer,
+         BalanceSwitchLog.objects.filter(tenant=tenant).select_related('from_account', 'to_account')),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the main finance endpoints in-process and print p50/p95 latency, queries and rows scanned as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant-index', type=int, default=0, help="Seeded tenant to query (see seed_finance).")
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', nargs='+', help="Endpoint names to run.")
+        parser.add_argument('--cache', action='store_true', help="Keep the response cache on (measures cache hits).")
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+        parser.add_argument('--baseline', help="Earlier JSON report to compare p50/p95 against.")
+        parser.add_argument('--serializers', action='store_true',
+                            help="Also compare ModelSerializer and fast serializer throughput on the tenant's rows.")
+        parser.add_argument('--json', action='store_true',
+                            help="Also compare JSON backend encode throughput on the tenant's yearly expense response.")
+        parser.add_argument('--auth', action='store_true',
+                            help="Also time JWT authentication with real signed tokens, with the token cache cold and warm.")
+        parser.add_argument('--export-rows', type=int,
+                            help="Also stream full expense exports of a dedicated tenant holding this many rows "
+                                 "(e.g. 1000000; seeded on first use) and report time and peak memory growth.")
+
+    def handle(self, *args, **options):
+        tenant, branch = seed_tenant(options['tenant_index']), seed_branch(options['tenant_index'])
+        account_id = Account.objects.filter(tenant=tenant).order_by('pk').values_list('pk', flat=True).first()
+        if account_id is None:
+            raise CommandError(f"Tenant {tenant} has no data; run seed_finance first.")
+
+        endpoints = default_endpoints(account_id, date.today())
+        if options['only']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint[0] in options['only']]
+
+        claims = {'user_id': str(seed_uuid('user', options['tenant_index'])), 'tenant': str(tenant), 'branches': [str(branch)]}
+        client = APIClient()
+        client.force_authenticate(user=CustomTokenUser(claims), token=claims)
+
+        with override_settings(ALLOWED_HOSTS=['*'], **({} if options['cache'] else {'RESPONSE_CACHE_TIMEOUT': 0})):
+            results = run_benchmark(client, endpoints, options['iterations'], options['warmup'])
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)['endpoints']
+            for name, result in results.items():
+                if name in baseline:
+                    for key in ('p50_ms', 'p95_ms'):
+                        result[f'{key}_change'] = round(result[key] / baseline[name][key] - 1, 3) if baseline[name][key] else None
+
+        report = {
+            'meta': {
+                'database': connection.vendor,
+                'tenant': str(tenant),
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'response_cache': options['cache'],
+            },
+            'endpoints': results,
+        }
+        if options['serializers']:
+            report['serializers'] = compare_serializers(serializer_cases(tenant), options['iterations'])
+        if options['json']:
+            with override_settings(ALLOWED_HOSTS=['*'], RESPONSE_CACHE_TIMEOUT=0):
+                yearly = client.get('/api/v1/expense/entries/', {'year': str(date.today().year), 'month': ''}).data
+            report['json'] = compare_json_backends(yearly, options['iterations'])
+        if options['auth']:
+            with override_settings(ALLOWED_HOSTS=['*'], RESPONSE_CACHE_TIMEOUT=0):
+                report['auth'] = compare_auth(APIClient(), claims, '/api/v1/accounts/accounts/')
+        if options['export_rows']:
+            if options['export_rows'] < 1:
+                raise CommandError("--export-rows must be positive.")
+            scope = seed_export_rows(options['export_rows'])
+            export_claims = {'user_id': str(scope['created_by']), 'tenant': str(scope['tenant']), 'branches': [str(scope['branch'])]}
+            export_client = APIClient()
+            export_client.force_authenticate(user=CustomTokenUser(export_claims), token=export_claims)
+            with override_settings(ALLOWED_HOSTS=['*']):
+                report['exports'] = run_export_benchmark(export_client, export_endpoints())
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
+        self.stdout.write(output)
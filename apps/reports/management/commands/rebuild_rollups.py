@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from apps.expense.models import Expense, ExpenseRollup
+from apps.income.models import Income, IncomeRollup
+from apps.reports.services import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the expense and income monthly rollups from the raw entries, one tenant at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help="Only rebuild the rollups of this tenant UUID.")
+
+    def handle(self, *args, **options):
+        for rollup_model, entry_model in ((ExpenseRollup, Expense), (IncomeRollup, Income)):
+            if options['tenant']:
+                tenants = [options['tenant']]
+            else:
+                tenants = set(entry_model.objects.values_list('tenant', flat=True).distinct())
+                tenants |= set(rollup_model.objects.values_list('tenant', flat=True).distinct())
+
+            for tenant in tenants:
+                count = rebuild_rollups(rollup_model, entry_model, tenant)
+                self.stdout.write(f"{rollup_model._meta.verbose_name_plural}: {count} rows for tenant {tenant}")
+
+        self.stdout.write(self.style.SUCCESS("Rollups rebuilt."))
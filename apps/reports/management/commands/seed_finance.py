@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reports.benchmark import seed_finance, seed_tenant
+
+
+class Command(BaseCommand):
+    help = "Deterministically generate tenants x accounts x entries of finance data for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenants', type=int, default=1)
+        parser.add_argument('--accounts', type=int, default=3, help="Accounts per tenant.")
+        parser.add_argument('--entries', type=int, default=1000, help="Income/expense entries per account.")
+        parser.add_argument('--days', type=int, default=730, help="Spread entry dates over this many days.")
+        parser.add_argument('--end', help="Latest entry date (YYYY-MM-DD, default today).")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true', help="Delete the seeded tenants' existing data first.")
+
+    def handle(self, *args, **options):
+        if min(options['tenants'], options['accounts'], options['entries'], options['days']) < 1:
+            raise CommandError("--tenants, --accounts, --entries and --days must be positive.")
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError("--end must be in YYYY-MM-DD format.")
+
+        counts = seed_finance(
+            options['tenants'], options['accounts'], options['entries'],
+            days=options['days'], end=end, seed=options['seed'], clear=options['clear'],
+        )
+        for index in range(options['tenants']):
+            self.stdout.write(f"tenant {index}: {seed_tenant(index)}")
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{count} {name}" for name, count in counts.items())))
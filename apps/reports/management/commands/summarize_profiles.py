@@ -0,0 +1,37 @@
+import glob
+import io
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Merge sampled request profiles and print the hottest functions across them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help="Profile directory (default PROFILING_DIR).")
+        parser.add_argument('--match', default='', help="Only merge profiles whose file name contains this, e.g. 'expense-entries'.")
+        parser.add_argument('--sort', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'])
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--output', help="Also write the merged pstats file here (for snakeviz, flameprof, gprof2dot).")
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILING_DIR
+        paths = sorted(
+            path for path in glob.glob(os.path.join(directory, '*.prof'))
+            if options['match'] in os.path.basename(path)
+        )
+        if not paths:
+            raise CommandError(f"No profiles found in {directory}.")
+
+        report = io.StringIO()
+        stats = pstats.Stats(*paths, stream=report)
+        if options['output']:
+            stats.dump_stats(options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Merged profile written to {options['output']}"))
+
+        self.stdout.write(f"Merged {len(paths)} profile(s) from {directory}")
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(report.getvalue())
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:03
+
+import apps.reports.models
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('report_type', models.CharField(choices=[('expenses', 'Expense Entries'), ('incomes', 'Income Entries'), ('balance_switches', 'Balance Switches'), ('cash_flow', 'Cash Flow')], max_length=30)),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'NDJSON'), ('json', 'JSON')], default='csv', max_length=10)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, storage=apps.reports.models.report_storage, upload_to='')),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('tenant', models.UUIDField()),
+                ('branches', models.JSONField(default=list)),
+                ('created_by', models.UUIDField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Report Job',
+                'verbose_name_plural': 'Report Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['tenant', 'created_by', '-created_at'], name='reportjob_owner_idx')],
+            },
+        ),
+    ]
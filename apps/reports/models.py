@@ -0,0 +1,55 @@
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+
+def report_storage():
+    return FileSystemStorage(location=settings.REPORT_STORAGE_ROOT)
+
+
+class ReportJob(models.Model):
+    REPORT_TYPES = (
+        ('expenses', 'Expense Entries'),
+        ('incomes', 'Income Entries'),
+        ('balance_switches', 'Balance Switches'),
+        ('cash_flow', 'Cash Flow'),
+    )
+    FORMATS = (
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+        ('json', 'JSON'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report_type = models.CharField(max_length=30, choices=REPORT_TYPES)
+    export_format = models.CharField(max_length=10, choices=FORMATS, default='csv')
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(storage=report_storage, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    tenant = models.UUIDField()
+    branches = models.JSONField(default=list)
+    created_by = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', 'created_by', '-created_at'], name='reportjob_owner_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} ({self.export_format}) - {self.status}"
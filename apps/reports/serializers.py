@@ -0,0 +1,34 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from .jobs import prepare_report
+from .models import ReportJob
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    format = serializers.ChoiceField(source='export_format', choices=ReportJob.FORMATS, default='csv')
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = (
+            'id', 'report_type', 'format', 'params', 'status', 'size', 'error',
+            'created_at', 'started_at', 'finished_at', 'download_url',
+        )
+        read_only_fields = ('status', 'size', 'error', 'created_at', 'started_at', 'finished_at')
+
+    def get_download_url(self, obj):
+        if obj.status != 'succeeded':
+            return None
+        return reverse('report-job-download', args=[obj.pk], request=self.context.get('request'))
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("params must be an object.")
+        return value
+
+    def validate(self, attrs):
+        try:
+            prepare_report(ReportJob(**attrs, branches=[]))
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return attrs
@@ -0,0 +1,245 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import CharField, Count, DateField, F, Q, Sum, Value
+from django.db.models.functions import ExtractMonth, ExtractYear, Trunc
+
+from config.cache import bump_data_version
+
+
+ACCOUNT_TYPES = ('CASH', 'BANK', 'DEBT')
+
+# build_summary/monthly_totals field mapping for ExpenseRollup/IncomeRollup querysets
+ROLLUP_FIELDS = {'amount_field': 'total', 'type_field': 'account_type', 'month_expr': F('month')}
+
+CASH_FLOW_BUCKETS = ('day', 'week', 'month', 'quarter', 'year')
+
+
+def parse_year_month(year, month=None):
+    """
+    Validate a raw year and optional month (empty for none), returning them as
+    ints. Raises ValueError with a message fit for the response.
+    """
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        raise ValueError("year must be an integer.")
+    if not 1 <= year <= 9998:
+        raise ValueError("year must be between 1 and 9998.")
+    if not month:
+        return year, None
+    try:
+        month = int(month)
+    except (TypeError, ValueError):
+        raise ValueError("month must be an integer.")
+    if not 1 <= month <= 12:
+        raise ValueError("month must be between 1 and 12.")
+    return year, month
+
+
+def parse_period(params, today):
+    """
+    Read ``year``/``month`` query params, defaulting to the current month.
+    An empty ``month`` selects the whole year. Raises ValueError on bad input.
+    """
+    return parse_year_month(params.get('year', today.year), params.get('month', today.month))
+
+
+def period_bounds(year, month=None):
+    """
+    Half-open ``(start, end)`` date range for a year or a single month, so
+    callers can filter with ``date__gte``/``date__lt`` and hit the date indexes.
+    """
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def parse_date_range(params, today):
+    """
+    Read inclusive ``start``/``end`` ISO date query params, defaulting to the
+    current calendar year. Raises ValueError on bad input.
+    """
+    try:
+        start = date.fromisoformat(params['start']) if params.get('start') else date(today.year, 1, 1)
+        end = date.fromisoformat(params['end']) if params.get('end') else date(today.year, 12, 31)
+    except ValueError:
+        raise ValueError("start and end must be dates in YYYY-MM-DD format.")
+    if start > end:
+        raise ValueError("start must not be after end.")
+    return start, end
+
+
+def cash_flow(income_queryset, expense_queryset, bucket='month', by_category=False):
+    """
+    Income, expense and net per ``bucket`` period for posted entries of the two
+    querysets, computed in the database by a single ``UNION ALL`` query of the
+    per-period (and per-category with ``by_category``) sums of each table.
+    """
+    if bucket not in CASH_FLOW_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(CASH_FLOW_BUCKETS)}.")
+
+    columns = ['period', 'kind'] + (['category_id', 'category__name'] if by_category else [])
+
+    def grouped(queryset, kind):
+        return (
+            queryset.filter(status=queryset.model.POSTED_STATUS)
+            .annotate(
+                period=Trunc('date', bucket, output_field=DateField()),
+                kind=Value(kind, output_field=CharField()),
+            )
+            .values(*columns)
+            .annotate(sum_amount=Sum('amount'))
+            .order_by()
+        )
+
+    rows = grouped(income_queryset, 'income').union(grouped(expense_queryset, 'expense'), all=True)
+
+    periods = {}
+    totals = {'income': Decimal("0"), 'expense': Decimal("0")}
+    categories = {}
+    for row in rows:
+        period = periods.setdefault(row['period'], {'income': Decimal("0"), 'expense': Decimal("0"), 'categories': []})
+        period[row['kind']] += row['sum_amount']
+        totals[row['kind']] += row['sum_amount']
+        if by_category:
+            category = {'type': row['kind'], 'category': row['category_id'], 'name': row['category__name']}
+            period['categories'].append({**category, 'total': row['sum_amount']})
+            key = (row['kind'], row['category_id'])
+            categories.setdefault(key, {**category, 'total': Decimal("0")})['total'] += row['sum_amount']
+
+    response_data = {
+        'bucket': bucket,
+        'periods': [],
+        'income_total': totals['income'],
+        'expense_total': totals['expense'],
+        'net_total': totals['income'] - totals['expense'],
+    }
+    for period_start in sorted(periods):
+        period = periods[period_start]
+        entry = {
+            'period': period_start.isoformat(),
+            'income': period['income'],
+            'expense': period['expense'],
+            'net': period['income'] - period['expense'],
+        }
+        if by_category:
+            entry['categories'] = sorted(period['categories'], key=lambda category: (category['type'], -category['total']))
+        response_data['periods'].append(entry)
+    if by_category:
+        response_data['categories'] = [
+            {**category, 'total': category['total']}
+            for category in sorted(categories.values(), key=lambda category: (category['type'], -category['total']))
+        ]
+    return response_data
+
+
+def monthly_totals(queryset, amount_field='amount', type_field='account__account_type', month_expr=None):
+    """
+    Group ``queryset`` by month in a single query, returning
+    ``{month: {'total': ..., 'cash': ..., 'bank': ..., 'debt': ...}}``.
+    """
+    keys = ('total',) + tuple(account_type.lower() for account_type in ACCOUNT_TYPES)
+    aggregates = {'sum_total': Sum(amount_field)}
+    for account_type in ACCOUNT_TYPES:
+        aggregates[f'sum_{account_type.lower()}'] = Sum(amount_field, filter=Q(**{type_field: account_type}))
+
+    rows = (
+        queryset.annotate(period=month_expr if month_expr is not None else ExtractMonth('date'))
+        .values('period')
+        .annotate(**aggregates)
+        .order_by('period')
+    )
+    return {row['period']: {key: row[f'sum_{key}'] for key in keys} for row in rows}
+
+
+def account_type_totals(row):
+    row = row or {}
+    return {
+        'monthly_total': row.get('total') or Decimal("0.00"),
+        'cash_total': row.get('cash') or Decimal("0.00"),
+        'bank_total': row.get('bank') or Decimal("0.00"),
+        'debt_total': row.get('debt') or Decimal("0.00"),
+    }
+
+
+def build_summary(queryset, year, month, today, **fields):
+    """
+    Build the summary payload for entries already filtered to the requested
+    year (and month, when given). Without a month the per-month breakdown and
+    yearly total are included and the headline totals cover the current month.
+    """
+    months = monthly_totals(queryset, **fields)
+    response_data = account_type_totals(months.get(month or today.month))
+
+    if not month:
+        response_data['yearly_data'] = [
+            {'month': f"{year}-{m:02d}", 'total': row['total'] or Decimal("0.00")}
+            for m, row in months.items()
+        ]
+        response_data['yearly_total'] = sum((row['total'] or 0 for row in months.values()), Decimal("0"))
+
+    return response_data
+
+
+def rollup_key(entry):
+    return (
+        entry.tenant, entry.branch, entry.date.year, entry.date.month,
+        entry.account.account_type, entry.category_id,
+    )
+
+
+def apply_rollups(rollup_model, entries, sign=1):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) posted entries from their monthly
+    rollup rows. Must run inside the transaction that changes the entries.
+    """
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for entry in entries:
+        delta = deltas[rollup_key(entry)]
+        delta[0] += entry.amount
+        delta[1] += 1
+
+    for (tenant, branch, year, month, account_type, category_id), (amount, count) in deltas.items():
+        rollup, _ = rollup_model.objects.select_for_update().get_or_create(
+            tenant=tenant, branch=branch, year=year, month=month,
+            account_type=account_type, category_id=category_id,
+        )
+        rollup_model.objects.filter(pk=rollup.pk).update(
+            total=F('total') + sign * amount,
+            entry_count=F('entry_count') + sign * count,
+        )
+        if sign < 0:
+            rollup_model.objects.filter(pk=rollup.pk, entry_count__lte=0).delete()
+
+
+def rebuild_rollups(rollup_model, entry_model, tenant):
+    """
+    Recompute every rollup row of ``tenant`` from its posted entries and
+    invalidate the tenant's cached summaries and ETags.
+    Returns the number of rollup rows written.
+    """
+    rows = (
+        entry_model.objects.filter(tenant=tenant, status=entry_model.POSTED_STATUS)
+        .annotate(period_year=ExtractYear('date'), period_month=ExtractMonth('date'))
+        .values('branch', 'period_year', 'period_month', 'account__account_type', 'category')
+        .annotate(total=Sum('amount'), entry_count=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups = [
+            rollup_model(
+                tenant=tenant, branch=row['branch'], year=row['period_year'], month=row['period_month'],
+                account_type=row['account__account_type'], category_id=row['category'],
+                total=row['total'], entry_count=row['entry_count'],
+            )
+            for row in rows
+        ]
+        rollup_model.objects.filter(tenant=tenant).delete()
+        rollup_model.objects.bulk_create(rollups, batch_size=500)
+        bump_data_version(tenant, entry_model)
+    return len(rollups)
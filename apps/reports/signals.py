@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.accounts.models import Account, BalanceSwitchLog
+from apps.expense.models import Expense, ExpenseCategory
+from apps.income.models import Income, IncomeCategory
+from config.cache import bump_data_version
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=BalanceSwitchLog)
+@receiver(post_save, sender=ExpenseCategory)
+@receiver(post_save, sender=IncomeCategory)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=BalanceSwitchLog)
+@receiver(post_delete, sender=ExpenseCategory)
+@receiver(post_delete, sender=IncomeCategory)
+def invalidate_tenant_responses(sender, instance, **kwargs):
+    bump_data_version(instance.tenant, sender)
@@ -0,0 +1,59 @@
+import logging
+import tempfile
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from config.db_router import replica_reads
+from .jobs import prepare_report
+from .models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+
+def _stale_running():
+    return Q(status='running', started_at__lt=timezone.now() - timedelta(seconds=settings.REPORT_JOB_TIMEOUT))
+
+
+@shared_task(time_limit=settings.REPORT_JOB_TIMEOUT)
+def generate_report(job_id):
+    """
+    Build a pending report job and store its artifact. Only the worker that
+    moves the job to running builds it, so a redelivered task is a no-op
+    while the job runs. A job left running past ``REPORT_JOB_TIMEOUT`` (the
+    task's hard time limit, so its worker died) is claimed again.
+    """
+    claim = ReportJob.objects.filter(Q(status='pending') | _stale_running(), pk=job_id)
+    if not claim.update(status='running', started_at=timezone.now()):
+        return
+    job = ReportJob.objects.get(pk=job_id)
+    try:
+        with replica_reads(tenant=job.tenant), tempfile.TemporaryFile() as artifact:
+            chunks = prepare_report(job)()
+            for chunk in chunks:
+                artifact.write(chunk)
+            job.size = artifact.tell()
+            artifact.seek(0)
+            job.file.save(f"{job.tenant}/{job.pk}.{job.export_format}", File(artifact), save=False)
+        job.status = 'succeeded'
+    except Exception as e:
+        logger.exception("report job %s failed", job_id)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'size', 'error', 'finished_at'])
+
+
+@shared_task
+def fail_stale_report_jobs():
+    """
+    Fail the jobs left running past ``REPORT_JOB_TIMEOUT`` whose task was never
+    redelivered, so they do not stay running forever.
+    """
+    return ReportJob.objects.filter(_stale_running()).update(
+        status='failed', error="The report worker stopped before finishing.", finished_at=timezone.now()
+    )
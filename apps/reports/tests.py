@@ -0,0 +1,276 @@
+import json
+import tempfile
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.handlers.asgi import ASGIHandler
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import Account
+from apps.expense.models import Expense, ExpenseCategory
+from apps.expense.serializers import ExpenseSerializer
+from apps.testing import api_client
+from config import metrics
+from config.celery import app as celery_app
+from config.cache import _version_key, bump_data_version, get_data_version
+from config.db_router import _pin_key, replica_reads
+from config.instrumentation import RequestMetrics, _current
+from config.serialization import fast_serializer
+from .benchmark import signed_token
+from .models import ReportJob
+from .tasks import fail_stale_report_jobs, generate_report
+
+
+class DataVersionTests(TestCase):
+    def test_evicted_version_restarts_above_every_earlier_version(self):
+        tenant = uuid.uuid4()
+        first = get_data_version(tenant)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(tenant, Expense)
+        bumped = get_data_version(tenant)
+
+        cache.delete(_version_key(tenant))
+
+        self.assertGreater(bumped, first)
+        self.assertGreater(get_data_version(tenant), bumped)
+
+    def test_bump_of_an_evicted_version_does_not_restart_low(self):
+        tenant = uuid.uuid4()
+        before = get_data_version(tenant)
+        cache.delete(_version_key(tenant))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(tenant)
+
+        self.assertGreater(get_data_version(tenant), before)
+
+
+class ResponseCacheTests(TestCase):
+    def test_write_invalidates_cached_list(self):
+        tenant, branch = uuid.uuid4(), uuid.uuid4()
+        scope = {'tenant': tenant, 'branch': branch, 'created_by': uuid.uuid4()}
+        client = api_client(tenant, branch)
+        category = ExpenseCategory.objects.create(name='Rent', **scope)
+        account = Account.objects.create(name='Till', account_type='CASH', **scope)
+
+        self.assertEqual(client.get('/api/v1/expense/entries/')['X-Cache'], 'MISS')
+        self.assertEqual(client.get('/api/v1/expense/entries/')['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.create(
+                date=date.today(), category=category, account=account, amount=Decimal("5.00"),
+                description='Rent', reference='R-1', **scope,
+            )
+
+        response = client.get('/api/v1/expense/entries/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['daily_data']), 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.tenant, self.branch = uuid.uuid4(), uuid.uuid4()
+        self.client = api_client(self.tenant, self.branch)
+        Account.objects.create(name='Till', account_type='CASH', tenant=self.tenant, branch=self.branch, created_by=uuid.uuid4())
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get('/api/v1/accounts/accounts/')['ETag']
+        self.assertEqual(self.client.get('/api/v1/accounts/accounts/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Account.objects.filter(tenant=self.tenant).first().save()
+
+        self.assertEqual(self.client.get('/api/v1/accounts/accounts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_no_etag_when_the_cache_cannot_hold_versions(self):
+        response = self.client.get('/api/v1/accounts/accounts/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routes reads between the primary and the development settings' second
+    SQLite database, standing in for a replica that has applied no write.
+    """
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        self.tenant, self.branch = uuid.uuid4(), uuid.uuid4()
+        self.scope = {'tenant': self.tenant, 'branch': self.branch, 'created_by': uuid.uuid4()}
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_reads_go_to_the_replica_until_the_tenant_writes(self):
+        Account.objects.create(name='Till', account_type='CASH', **self.scope)
+        cache.delete(_pin_key(self.tenant))
+
+        with replica_reads(tenant=self.tenant):
+            self.assertEqual(Account.objects.filter(tenant=self.tenant).count(), 0)
+
+        with transaction.atomic():
+            Account.objects.create(name='Bank', account_type='BANK', **self.scope)
+            bump_data_version(self.tenant, Account)
+
+        # Right after the write, the tenant's reads are pinned to the primary
+        with replica_reads(tenant=self.tenant):
+            self.assertEqual(Account.objects.filter(tenant=self.tenant).count(), 2)
+        with replica_reads(tenant=uuid.uuid4()):
+            self.assertEqual(Account.objects.filter(tenant=self.tenant).count(), 0)
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_read_after_a_write_in_the_same_block_stays_on_the_primary(self):
+        with replica_reads(tenant=self.tenant):
+            Account.objects.create(name='Till', account_type='CASH', **self.scope)
+
+            self.assertEqual(Account.objects.filter(tenant=self.tenant).count(), 1)
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_list_right_after_a_post_sees_the_new_row(self):
+        client = api_client(self.tenant, self.branch)
+        self.assertEqual(client.get('/api/v1/accounts/accounts/').data['count'], 0)
+
+        response = client.post('/api/v1/accounts/accounts/', {'name': 'Till', 'account_type': 'CASH', 'balance': '5.00'})
+        self.assertEqual(response.status_code, 201, response.data)
+
+        listed = client.get('/api/v1/accounts/accounts/').data
+        self.assertEqual([account['name'] for account in listed['results']], ['Till'])
+
+
+class ReportJobTestCase(TestCase):
+    def setUp(self):
+        self.tenant, self.branch = uuid.uuid4(), uuid.uuid4()
+        self.scope = {'tenant': self.tenant, 'branch': self.branch, 'created_by': uuid.uuid4()}
+        self.client = api_client(self.tenant, self.branch)
+        storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_dir.cleanup)
+        self.enterContext(mock.patch.object(ReportJob._meta.get_field('file'), 'storage', FileSystemStorage(storage_dir.name)))
+
+    def create_job(self, **fields):
+        return ReportJob.objects.create(
+            report_type='expenses', export_format='csv', tenant=self.tenant, branches=[str(self.branch)],
+            created_by=self.scope['created_by'], **fields,
+        )
+
+
+class EagerReportJobTests(ReportJobTestCase):
+    def test_job_submitted_in_eager_mode_is_built_and_downloadable(self):
+        category = ExpenseCategory.objects.create(name='Rent', **self.scope)
+        account = Account.objects.create(name='Till', account_type='CASH', **self.scope)
+        Expense.objects.create(
+            date=date.today(), category=category, account=account, amount=Decimal("5.00"),
+            description='Office rent', reference='R-1', status='draft', **self.scope,
+        )
+
+        # Celery reads its settings under the CELERY_ namespace, which shadows task_always_eager
+        self.addCleanup(celery_app.conf.update, CELERY_TASK_ALWAYS_EAGER=celery_app.conf.CELERY_TASK_ALWAYS_EAGER)
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/reports/jobs/', {'report_type': 'expenses', 'format': 'csv'}, format='json')
+        self.assertEqual(response.status_code, 202, response.data)
+
+        job = self.client.get(f"/api/v1/reports/jobs/{response.data['id']}/").data
+        self.assertEqual(job['status'], 'succeeded', job['error'])
+        download = self.client.get(f"/api/v1/reports/jobs/{job['id']}/download/")
+        self.assertEqual(download.status_code, 200)
+        self.assertIn(b'Office rent', b''.join(download.streaming_content))
+
+
+class StaleReportJobTests(ReportJobTestCase):
+    def test_job_left_running_past_the_timeout_is_claimed_again(self):
+        job = self.create_job(status='running', started_at=timezone.now() - timedelta(seconds=settings.REPORT_JOB_TIMEOUT + 1))
+
+        generate_report(str(job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+
+    def test_job_still_running_within_the_timeout_is_left_alone(self):
+        job = self.create_job(status='running', started_at=timezone.now())
+
+        generate_report(str(job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+
+    def test_stale_jobs_are_failed_by_the_sweep(self):
+        stale = self.create_job(status='running', started_at=timezone.now() - timedelta(seconds=settings.REPORT_JOB_TIMEOUT + 1))
+        fresh = self.create_job(status='running', started_at=timezone.now())
+
+        self.assertEqual(fail_stale_report_jobs(), 1)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((stale.status, fresh.status), ('failed', 'running'))
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class ExactDecimalTests(TestCase):
+    def test_aggregates_render_with_the_money_fields_decimal_places(self):
+        tenant, branch = uuid.uuid4(), uuid.uuid4()
+        scope = {'tenant': tenant, 'branch': branch, 'created_by': uuid.uuid4()}
+        client = api_client(tenant, branch)
+        category = ExpenseCategory.objects.create(name='Rent', **scope)
+        account = Account.objects.create(name='Till', account_type='CASH', balance=Decimal("20000.00"), **scope)
+        for amount in ('18722.45', '3.10'):
+            response = client.post('/api/v1/expense/entries/', {
+                'date': date.today().isoformat(), 'category': category.pk, 'account': account.pk,
+                'amount': amount, 'description': 'Rent', 'reference': f'R-{amount}', 'status': 'paid',
+            })
+            self.assertEqual(response.status_code, 201, response.data)
+
+        response = client.get('/api/v1/reports/cash-flow/', HTTP_ACCEPT='application/json; version=2')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        totals = {name: data[name] for name in ('income_total', 'expense_total', 'net_total')}
+        self.assertEqual(totals, {'income_total': '0.00', 'expense_total': '18725.55', 'net_total': '-18725.55'})
+
+
+class AsgiMiddlewareTests(SimpleTestCase):
+    @override_settings(DEBUG=True, METRICS_ENABLED=True, DATABASE_REPLICAS=['replica_1'])
+    def test_no_middleware_is_adapted_to_sync_under_asgi(self):
+        # With DEBUG on, Django logs every sync/async adaptation it makes while loading the stack
+        with mock.patch('django.core.handlers.base.logger') as logger:
+            ASGIHandler()
+
+        logged = [call.args for call in logger.debug.call_args_list]
+        # Disabled middleware is adapted before it raises MiddlewareNotUsed, then dropped
+        unused = {f"middleware {path}" for message, path in logged if message.startswith('MiddlewareNotUsed')}
+        self.assertEqual([name for message, name in logged if 'adapted' in message and name not in unused], [])
+
+
+class SerializerTimingTests(SimpleTestCase):
+    def test_fast_serializer_rows_count_as_serializer_time(self):
+        metrics = RequestMetrics()
+        self.addCleanup(_current.reset, _current.set(metrics))
+        fast = fast_serializer(ExpenseSerializer, ('date', 'amount'))
+        rows = [{'date': date(2026, 1, 5), 'amount': Decimal("1.00")}] * 1000
+
+        fast.many(rows)
+        fast.columnar(rows)
+
+        self.assertGreater(metrics.serializer_time, 0)
+        self.assertEqual(metrics.serializer_depth, 0)
+
+
+@override_settings(METRICS_ENABLED=True, RESPONSE_CACHE_TIMEOUT=0)
+class AsyncViewMetricsTests(TransactionTestCase):
+    async def test_queries_run_on_executor_threads_are_counted(self):
+        tenant = uuid.uuid4()
+        token = signed_token({'user_id': str(uuid.uuid4()), 'tenant': str(tenant), 'branches': [str(uuid.uuid4())]})
+        # Histogram state ends with the sum and count of the observed values
+        before = metrics.REQUEST_QUERIES.values.get(('report-async-dashboard',), [0, 0])[-2]
+
+        response = await self.async_client.get('/api/v1/reports/async/dashboard/', headers={'Authorization': f"JWT {token}"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(metrics.REQUEST_QUERIES.values[('report-async-dashboard',)][-2], before)
@@ -0,0 +1,14 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+from . import async_views
+from .views import ReportJobViewSet, ReportViewSet
+
+router = DefaultRouter()
+router.register('jobs', ReportJobViewSet, basename='report-job')
+router.register('', ReportViewSet, basename='report')
+
+urlpatterns = [
+    path('async/dashboard/', async_views.dashboard, name='report-async-dashboard'),
+    path('async/expense-summary/', async_views.expense_summary, name='report-async-expense-summary'),
+    path('async/income-summary/', async_views.income_summary, name='report-async-income-summary'),
+] + router.urls
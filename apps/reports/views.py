@@ -0,0 +1,123 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db import transaction
+from django.http import FileResponse
+from django.utils import timezone
+from apps.expense.models import Expense
+from apps.income.models import Income
+from config.authentication import get_tenant_scope
+from config.cache import cached_response
+from .dashboard import build_dashboard
+from .jobs import CONTENT_TYPES
+from .models import ReportJob
+from .serializers import ReportJobSerializer
+from .services import CASH_FLOW_BUCKETS, cash_flow, parse_date_range, parse_period
+from .tasks import generate_report
+
+CASH_FLOW_PARAMS = [
+    openapi.Parameter('start', openapi.IN_QUERY, description="First day (YYYY-MM-DD, default 1 January)", type=openapi.TYPE_STRING),
+    openapi.Parameter('end', openapi.IN_QUERY, description="Last day (YYYY-MM-DD, default 31 December)", type=openapi.TYPE_STRING),
+    openapi.Parameter('bucket', openapi.IN_QUERY, description="Period size", type=openapi.TYPE_STRING, enum=list(CASH_FLOW_BUCKETS)),
+    openapi.Parameter('by_category', openapi.IN_QUERY, description="Break each period down per category", type=openapi.TYPE_BOOLEAN),
+]
+
+PERIOD_PARAMS = [
+    openapi.Parameter('year', openapi.IN_QUERY, description="Year (default current)", type=openapi.TYPE_INTEGER),
+    openapi.Parameter('month', openapi.IN_QUERY, description="Month, empty for the whole year (default current)", type=openapi.TYPE_STRING),
+]
+
+
+class ReportViewSet(viewsets.ViewSet):
+
+    @swagger_auto_schema(manual_parameters=CASH_FLOW_PARAMS, operation_id="cash_flow Report",
+                         operation_description="Income, expense and net per period", tags=["Reports"])
+    @action(detail=False, methods=['get'], url_path='cash-flow')
+    @cached_response('cash-flow')
+    def cash_flow(self, request):
+        """
+        Income, expense and net per day/week/month/quarter/year between ``start``
+        and ``end``, optionally per category, from one query over both tables.
+        """
+        try:
+            start, end = parse_date_range(request.query_params, timezone.now().date())
+            scope = {**get_tenant_scope(request), 'date__gte': start, 'date__lte': end}
+            response_data = cash_flow(
+                Income.objects.filter(**scope),
+                Expense.objects.filter(**scope),
+                bucket=request.query_params.get('bucket', 'month'),
+                by_category=request.query_params.get('by_category', '').lower() in ('1', 'true', 'yes'),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'start': start.isoformat(), 'end': end.isoformat(), **response_data})
+
+    @swagger_auto_schema(manual_parameters=PERIOD_PARAMS, operation_id="dashboard Report",
+                         operation_description="Expense and income summaries, account balances and cash flow", tags=["Reports"])
+    @action(detail=False, methods=['get'])
+    @cached_response('dashboard')
+    def dashboard(self, request):
+        """
+        Expense and income summaries, account balances and the period's cash
+        flow in one payload. ``/reports/async/dashboard/`` serves the same
+        payload under ASGI with the parts queried concurrently.
+        """
+        today = timezone.now().date()
+        try:
+            year, month = parse_period(request.query_params, today)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(build_dashboard(get_tenant_scope(request), year, month, today))
+
+
+class ReportJobViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Submit long-running reports to the Celery workers, poll their status and
+    download the stored artifact once the job has succeeded.
+    """
+    serializer_class = ReportJobSerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return ReportJob.objects.none()
+        return ReportJob.objects.filter(tenant=self.request.auth['tenant'], created_by=self.request.user.id)
+
+    @swagger_auto_schema(operation_id="create Report Job", operation_description="Submit a report job", tags=["Report Jobs"])
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    @swagger_auto_schema(operation_id="list Report Job", operation_description="Retrieve a list of Report Job", tags=["Report Jobs"])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(operation_id="retrieve Report Job", operation_description="Retrieve the status of a Report Job", tags=["Report Jobs"])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        job = serializer.save(
+            tenant=self.request.auth['tenant'],
+            branches=[str(branch) for branch in self.request.auth['branches']],
+            created_by=self.request.user.id
+        )
+        transaction.on_commit(lambda: generate_report.delay(str(job.pk)))
+
+    @swagger_auto_schema(operation_id="download Report Job", operation_description="Download a finished report", tags=["Report Jobs"])
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'succeeded':
+            return Response({'error': f"Report is {job.status}, not ready for download."}, status=status.HTTP_409_CONFLICT)
+
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=f"{job.report_type}-{job.pk}.{job.export_format}",
+            content_type=CONTENT_TYPES[job.export_format],
+        )
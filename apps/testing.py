@@ -0,0 +1,58 @@
+import uuid
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.reports.services import rebuild_rollups
+from config.authentication import CustomTokenUser
+
+
+def api_client(tenant, branch):
+    """
+    An ``APIClient`` authenticated with the JWT claims of a user of ``tenant`` limited to ``branch``.
+    """
+    claims = {'user_id': str(uuid.uuid4()), 'tenant': str(tenant), 'branches': [str(branch)]}
+    client = APIClient()
+    client.force_authenticate(user=CustomTokenUser(claims), token=claims)
+    return client
+
+
+class QueryPlanAssertions:
+    def assertUsesIndex(self, queryset, *index_names):
+        """
+        SQLite's EXPLAIN QUERY PLAN for ``queryset`` searches one of ``index_names`` instead of scanning the table.
+        """
+        plan = queryset.explain()
+        self.assertNotIn(f"SCAN {queryset.model._meta.db_table}", plan)
+        self.assertTrue(any(f"USING INDEX {name} " in plan for name in index_names), plan)
+
+
+class ScopedTestCase(TestCase):
+    """
+    A fresh tenant with one branch, ``scope`` (tenant, branch and creator) for
+    its rows and a ``client`` authenticated for it.
+    """
+
+    def setUp(self):
+        self.tenant, self.branch = uuid.uuid4(), uuid.uuid4()
+        self.scope = {'tenant': self.tenant, 'branch': self.branch, 'created_by': uuid.uuid4()}
+        self.client = api_client(self.tenant, self.branch)
+        self.today = date.today()
+
+    def seed_entries(self, model, rollup_model, count, amount, status=None, **fields):
+        """
+        Insert ``count`` income/expense entries (posted unless ``status`` says
+        otherwise) spread back from the current month over the months of this
+        year, bypassing the API, and rebuild the rollups.
+        """
+        entries = model.objects.bulk_create([
+            model(
+                date=self.today.replace(month=self.today.month - n % self.today.month, day=1), amount=amount,
+                description='Seeded', reference=f'S-{uuid.uuid4().hex}', status=status or model.POSTED_STATUS,
+                **fields, **self.scope,
+            )
+            for n in range(count)
+        ])
+        rebuild_rollups(rollup_model, model, self.tenant)
+        return entries
@@ -1,3 +1,9 @@
+import hashlib
+import threading
+import time
+
+from cachetools import TLRUCache
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.models import TokenUser
 from rest_framework_simplejwt.exceptions import InvalidToken
@@ -8,10 +14,56 @@ class CustomTokenUser(TokenUser):
         return getattr(self, 'email', str(self.id))
 
 
+def _token_expiry(key, value, now):
+    # Never keep a token past its own ``exp`` claim.
+    _, validated_token = value
+    return min(now + settings.AUTH_TOKEN_CACHE_TTL, validated_token.get('exp', now))
+
+
+_token_cache = TLRUCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttu=_token_expiry, timer=time.time)
+_token_cache_lock = threading.Lock()
+
+
 class CustomJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that remembers validated tokens, keyed by a hash of the
+    raw token, so repeat requests skip signature verification and user
+    construction until the token (or the cache TTL) expires.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        key = hashlib.sha256(raw_token).hexdigest()
+        with _token_cache_lock:
+            cached = _token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        validated_token = self.get_validated_token(raw_token)
+        result = (self.get_user(validated_token), validated_token)
+        with _token_cache_lock:
+            _token_cache[key] = result
+        return result
+
     def get_user(self, validated_token):
         try:
-            print("Using CustomJWTAuthentication with CustomTokenUser")  # Debug
             return CustomTokenUser(validated_token)
         except KeyError as e:
             raise InvalidToken(f"Token missing required claim: {str(e)}")
+
+
+def get_tenant_scope(request):
+    """
+    Queryset filter kwargs limiting rows to the tenant and branches in the caller's token.
+    """
+    return {
+        'tenant': request.auth['tenant'],
+        'branch__in': request.auth['branches'],
+    }
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from .db_router import pin_to_primary
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _version_key(tenant, model=None):
+    if model is None:
+        return f"finance:data-version:{tenant}"
+    return f"finance:data-version:{tenant}:{model._meta.label_lower}"
+
+
+def _start_version(key):
+    # A version missing from the cache (never written, or evicted) starts at the
+    # current time in nanoseconds rather than 1, so a reset can never repeat a
+    # version an earlier cache key or ETag was built from
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def get_data_version(tenant):
+    key = _version_key(tenant)
+    version = cache.get(key)
+    return _start_version(key) if version is None else version
+
+
+def get_resource_versions(tenant, models):
+    """
+    The write versions of ``models`` for ``tenant``, in one cache round trip.
+    """
+    keys = [_version_key(tenant, model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = _start_version(key)
+    return [versions[key] for key in keys]
+
+
+def bump_data_version(tenant, *models):
+    """
+    Invalidate every cached response of ``tenant`` by moving its data version
+    on, along with the write versions of ``models`` that ETags are built from.
+    The versions live in the shared cache, so every worker process sees the
+    bump (see ``shared_caches`` in the settings).
+    Runs after the surrounding transaction commits, so a request can never
+    cache pre-commit data under the new version. The tenant's reads are
+    pinned to the primary first, so nothing is cached or ETagged under the
+    new version from a replica that has not applied the write yet.
+    """
+    def bump():
+        pin_to_primary(tenant)
+        for key in [_version_key(tenant)] + [_version_key(tenant, model) for model in models]:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def get_cache_stats():
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+    CACHE_REQUESTS.inc(result='hit' if outcome == 'hits' else 'miss')
+
+
+def response_cache_key(request, endpoint):
+    tenant = request.auth['tenant']
+    branches = ','.join(sorted(str(branch) for branch in request.auth['branches']))
+    params = '&'.join(f"{key}={value}" for key, value in sorted(request.query_params.lists()))
+    # The format can also come from the Accept header
+    renderer = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    digest = hashlib.md5(f"{branches}|{params}|{renderer}".encode()).hexdigest()
+    return f"finance:response:{tenant}:{endpoint}:{get_data_version(tenant)}:{digest}"
+
+
+def cached_response(endpoint):
+    """
+    Cache a viewset action's successful Response data per tenant, branches,
+    endpoint, query params and tenant data version. Writes bump the version,
+    so stale entries are never served and simply expire. Sets ``X-Cache``.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_cache_key(request, endpoint)
+            data = cache.get(key)
+            if data is not None:
+                _record('hits')
+                logger.debug("cache hit %s", key)
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _record('misses')
+            logger.debug("cache miss %s", key)
+            response = view_method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def response_etag(request, models):
+    """
+    Strong ETag for a GET: the tenant's write versions of ``models`` plus
+    everything else that shapes the body (URL with query string, branches,
+    negotiated media type, API version and today's date, which is the
+    default period). None when the versions cannot be kept in the cache.
+    """
+    tenant = request.auth['tenant']
+    versions = get_resource_versions(tenant, models)
+    if None in versions:
+        # The cache could not hold a version, so a later write would go unnoticed
+        return None
+    branches = ','.join(sorted(str(branch) for branch in request.auth['branches']))
+    parts = [
+        request.build_absolute_uri(), branches, str(getattr(request, 'accepted_media_type', '')),
+        str(getattr(request, 'version', '')), timezone.now().date().isoformat(), *(str(version) for version in versions),
+    ]
+    return '"' + hashlib.md5('|'.join(parts).encode()).hexdigest() + '"'
+
+
+def conditional_response(*models):
+    """
+    ETag a viewset GET action on the tenant's write versions of ``models``
+    (every model the response reads). A matching ``If-None-Match`` is
+    answered with 304 before the action runs, so no query is made; other
+    successful responses carry the ``ETag``. The versions must live in a
+    cache shared by every worker, or a worker that missed a write would
+    answer 304 for stale data. Apply outside ``cached_response``.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = response_etag(request, models)
+            if etag is None:
+                return view_method(self, request, *args, **kwargs)
+            # If-None-Match uses the weak comparison. "*" is not honoured: whether the
+            # resource exists is not known without a query.
+            candidates = {tag.removeprefix('W/') for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))}
+            if etag in candidates:
+                response = Response(status=304)
+            else:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            return response
+
+        return wrapper
+
+    return decorator
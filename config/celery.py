@@ -0,0 +1,13 @@
+import os
+
+from celery import Celery
+from dotenv import load_dotenv
+
+load_dotenv()
+
+django_env = os.getenv("DJANGO_ENV", "development").lower()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", f"config.settings.{django_env}")
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
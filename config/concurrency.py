@@ -0,0 +1,93 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.http.request import MediaType
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .authentication import CustomJWTAuthentication
+from .renderers import ExactDecimalJSONEncoder, dumps
+
+
+def _on_own_connection(func):
+    """
+    Run ``func`` and then release the worker thread's database connections
+    (kept open only as long as ``CONN_MAX_AGE`` allows, as after a request).
+    """
+    @wraps(func)
+    def wrapper():
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+async def run_concurrently(*funcs):
+    """
+    Run the zero-argument sync ``funcs`` (ORM queries) at the same time and
+    return their results in order.
+
+    Each runs on its own executor thread (``thread_sensitive=False``), so on
+    its own database connection. Django's async ORM methods and the default
+    ``sync_to_async`` all share the one thread-sensitive thread and would run
+    one after another. The funcs must not depend on each other or on an open
+    transaction, since they see separate connections.
+    """
+    return await asyncio.gather(*(
+        sync_to_async(_on_own_connection(func), thread_sensitive=False)() for func in funcs
+    ))
+
+
+def requested_version(request):
+    """
+    The ``version`` parameter of the ``Accept`` header (as read by
+    ``AcceptHeaderVersioning``), or the default version.
+    """
+    for media_type in request.META.get('HTTP_ACCEPT', '').split(','):
+        version = MediaType(media_type.strip()).params.get('version')
+        if version:
+            return version
+    return settings.REST_FRAMEWORK['DEFAULT_VERSION']
+
+
+def json_response(data, status_code=status.HTTP_200_OK, request=None):
+    exact = request is not None and int(requested_version(request)) >= settings.EXACT_DECIMAL_VERSION
+    content = dumps(data, ExactDecimalJSONEncoder) if exact else dumps(data)
+    return HttpResponse(content, status=status_code, content_type='application/json')
+
+
+def async_api_view(view):
+    """
+    Turn an ``async def view(request)`` returning JSON-able data into a GET
+    endpoint with the API's JWT authentication, error shape and JSON
+    encoding, for the handful of views that run outside DRF under ASGI.
+    ``ValueError`` becomes a 400 ``{'error': ...}`` response.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return HttpResponseNotAllowed(['GET'])
+        try:
+            authenticated = CustomJWTAuthentication().authenticate(request)
+        except APIException as e:
+            return json_response({'detail': e.detail}, e.status_code)
+        if authenticated is None:
+            return json_response({'detail': "Authentication credentials were not provided."}, status.HTTP_401_UNAUTHORIZED)
+        if requested_version(request) not in settings.REST_FRAMEWORK['ALLOWED_VERSIONS']:
+            return json_response({'detail': "Invalid version in \"Accept\" header."}, status.HTTP_406_NOT_ACCEPTABLE)
+        request.user, request.auth = authenticated
+
+        try:
+            data = await view(request, *args, **kwargs)
+        except ValueError as e:
+            return json_response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+        return json_response(data, request=request)
+
+    # Read-only reporting views; see config.db_router.ReplicaRoutingMiddleware
+    wrapper.replica_reads = True
+    return wrapper
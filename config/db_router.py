@@ -0,0 +1,146 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_current = ContextVar('replica_routing', default=None)
+
+
+def _pin_key(tenant):
+    return f"finance:primary-pin:{tenant}"
+
+
+def pin_to_primary(tenant):
+    """
+    Keep ``tenant``'s reads on the primary for ``REPLICA_STICKY_SECONDS``, so
+    they see a write the replicas may not have applied yet. Called right after
+    the write commits (see ``bump_data_version``). The pin is kept in the
+    cache shared by every worker process, so it holds whichever worker
+    serves the next read.
+    """
+    if settings.DATABASE_REPLICAS:
+        cache.set(_pin_key(tenant), True, settings.REPLICA_STICKY_SECONDS)
+
+
+class ReplicaRouting:
+    """
+    Routing state of one request or job; its reads go to a replica once
+    ``enabled``. ``tenant`` is read from the request's JWT claims once DRF
+    has authenticated it, or given directly.
+    """
+    __slots__ = ('request', '_tenant', 'enabled', 'pinned')
+
+    def __init__(self, request=None, tenant=None, enabled=True):
+        self.request = request
+        self._tenant = tenant
+        self.enabled = enabled
+        self.pinned = None
+
+    @property
+    def tenant(self):
+        if self._tenant is None:
+            claims = getattr(self.request, 'auth', None)
+            self._tenant = claims.get('tenant') if claims else None
+        return self._tenant
+
+    def on_primary(self):
+        if self.pinned is None:
+            tenant = self.tenant
+            if tenant is None:
+                # Not authenticated yet; decide again on the next query
+                return True
+            self.pinned = bool(cache.get(_pin_key(tenant)))
+        return self.pinned
+
+
+@contextmanager
+def replica_reads(request=None, tenant=None):
+    """
+    Let reads inside the block go to a replica, unless the tenant wrote
+    within ``REPLICA_STICKY_SECONDS`` or the block writes itself.
+    """
+    token = _current.set(ReplicaRouting(request, tenant))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads made inside ``replica_reads`` to a random alias in
+    ``DATABASE_REPLICAS``, and everything else (writes, ``select_for_update``,
+    reads inside a transaction on the primary, reads after a write in the
+    same block) to ``default``. Replicas are never migrated; they get the
+    schema through replication.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or not state.enabled or not settings.DATABASE_REPLICAS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block or state.on_primary():
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route the reads of replica-safe endpoints to the replicas. Those are
+    the viewset actions in ``REPLICA_READ_ACTIONS`` and views marked with a
+    ``replica_reads`` attribute. Removed from the stack when no replicas
+    are configured. Runs natively under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # process_view only flips ``enabled`` on this object, which stays
+        # visible wherever the view runs (including sync_to_async threads)
+        token = _current.set(ReplicaRouting(request, enabled=False))
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        token = _current.set(ReplicaRouting(request, enabled=False))
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _current.get()
+        if state is None or request.method not in ('GET', 'HEAD'):
+            return None
+        action = (getattr(view_func, 'actions', None) or {}).get(request.method.lower())
+        state.enabled = action in settings.REPLICA_READ_ACTIONS or getattr(view_func, 'replica_reads', False)
+        return None
@@ -0,0 +1,137 @@
+import logging
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+_project_root = str(settings.BASE_DIR)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializer_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+def call_site():
+    """
+    The innermost project frame outside this module, e.g. ``apps/expense/views.py:212 in list``.
+    """
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(_project_root) and 'site-packages' not in frame.filename \
+                and not frame.filename.endswith('instrumentation.py'):
+            return f"{frame.filename[len(_project_root) + 1:]}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+@contextmanager
+def serializer_timing():
+    """
+    Count the block as serializer time of the request being instrumented.
+    Only the outermost block is timed (nested serializers are part of it),
+    and queries it runs stay DB time.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    started, db_time = time.perf_counter(), metrics.db_time
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        if not metrics.serializer_depth:
+            metrics.serializer_time += time.perf_counter() - started - (metrics.db_time - db_time)
+
+
+def _install_serializer_timing():
+    """
+    Time DRF's ``serializer.data``; ``FastSerializer`` times itself. Installed
+    once, and only when the middleware is enabled.
+    """
+    data = BaseSerializer.data
+    if getattr(data.fget, 'instrumented', False):
+        return
+
+    def timed_data(self):
+        with serializer_timing():
+            return data.fget(self)
+
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+class QueryTimingMiddleware:
+    """
+    Record SQL query count, DB time, serializer time and total time per
+    request, expose them as a ``Server-Timing`` header and log one line per
+    request. Queries slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged with
+    their SQL and call site. Removed from the stack entirely unless
+    ``REQUEST_INSTRUMENTATION`` is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_query_threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        _install_serializer_timing()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+
+        def execute(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.queries += 1
+                metrics.db_time += elapsed
+                if elapsed >= self.slow_query_threshold:
+                    logger.warning(
+                        "slow query %.1fms at %s: %s", elapsed * 1000, call_site(), sql,
+                        extra={'duration_ms': elapsed * 1000, 'sql': sql, 'alias': context['connection'].alias},
+                    )
+
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(execute))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        timings = {
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+            'queries': metrics.queries,
+        }
+        response['Server-Timing'] = (
+            f'db;dur={timings["db_ms"]};desc="{metrics.queries} queries", '
+            f'serialize;dur={timings["serializer_ms"]}, total;dur={timings["total_ms"]}'
+        )
+        logger.info(
+            "%s %s status=%s total_ms=%s db_ms=%s queries=%s serializer_ms=%s",
+            request.method, request.path, response.status_code, timings['total_ms'], timings['db_ms'],
+            timings['queries'], timings['serializer_ms'],
+            extra={'method': request.method, 'path': request.path, 'status': response.status_code, **timings},
+        )
+        return response
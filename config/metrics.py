@@ -0,0 +1,292 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_lock = threading.Lock()
+_registry = {}
+# Query count of the current request. Context variables are copied into the
+# threads sync_to_async runs code on, so queries an async view runs on
+# executor threads are counted too.
+_request_queries = ContextVar('metrics_request_queries', default=None)
+
+
+class Metric:
+    """
+    A counter or histogram kept in this process. Values are keyed by their
+    label values; histograms store cumulative bucket counts followed by sum and count.
+    """
+
+    def __init__(self, name, documentation, kind, labels=(), buckets=None):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) if buckets else None
+        self.values = {}
+        _registry[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        _mark_dirty()
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # Bucket counts are kept cumulative (every bucket with bound >= value)
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+        _mark_dirty()
+
+
+def counter(name, documentation, labels=()):
+    return Metric(name, documentation, 'counter', labels)
+
+
+def histogram(name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+    return Metric(name, documentation, 'histogram', labels, buckets)
+
+
+REQUEST_SECONDS = histogram(
+    'finance_http_request_duration_seconds', "Request latency by route and method.", ('route', 'method'))
+REQUESTS = counter(
+    'finance_http_requests_total', "Requests by route, method and status code.", ('route', 'method', 'status'))
+REQUEST_QUERIES = histogram(
+    'finance_db_queries_per_request', "SQL queries issued per request.", ('route',), QUERY_BUCKETS)
+BALANCE_POSTINGS = counter(
+    'finance_balance_postings_total', "Ledger postings applied, by source type.", ('source_type',))
+BALANCE_POSTING_SECONDS = histogram(
+    'finance_balance_posting_duration_seconds', "Duration of post_balance_changes calls.", ('result',))
+CACHE_REQUESTS = counter(
+    'finance_response_cache_requests_total', "Response cache lookups by result.", ('result',))
+
+
+def snapshot():
+    with _lock:
+        return {
+            name: {json.dumps(key): list(value) if isinstance(value, list) else value
+                   for key, value in metric.values.items()}
+            for name, metric in _registry.items()
+        }
+
+
+def merge(snapshots):
+    merged = {name: {} for name in _registry}
+    for data in snapshots:
+        for name, values in data.items():
+            if name not in merged:
+                continue
+            for key, value in values.items():
+                current = merged[name].get(key)
+                if current is None:
+                    merged[name][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    merged[name][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[name][key] = current + value
+    return merged
+
+
+# Multi-process mode: every process writes its snapshot to METRICS_MULTIPROC_DIR/<pid>.json
+# (atomically, at most once per METRICS_FLUSH_INTERVAL) and a scrape sums all the files.
+
+_dirty = threading.Event()
+_flusher = None
+
+
+def _multiproc_dir():
+    return settings.METRICS_MULTIPROC_DIR
+
+
+def flush():
+    directory = _multiproc_dir()
+    if not directory:
+        return
+    _dirty.clear()
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    temporary = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary, 'w') as snapshot_file:
+        json.dump(snapshot(), snapshot_file)
+    os.replace(temporary, path)
+
+
+def _flush_loop():
+    while True:
+        _dirty.wait()
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        flush()
+
+
+def _mark_dirty():
+    global _flusher
+    if not _multiproc_dir():
+        return
+    _dirty.set()
+    if _flusher is None or _flusher.pid != os.getpid():
+        with _lock:
+            if _flusher is None or _flusher.pid != os.getpid():
+                os.makedirs(_multiproc_dir(), exist_ok=True)
+                thread = threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True)
+                thread.pid = os.getpid()
+                thread.start()
+                atexit.register(flush)
+                _flusher = thread
+
+
+def collect():
+    directory = _multiproc_dir()
+    if not directory:
+        return merge([snapshot()])
+    flush()
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path) as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            continue
+    return merge(snapshots)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(merged):
+    """
+    Prometheus text exposition (format 0.0.4) of the merged metric values.
+    """
+    lines = []
+    for name, metric in _registry.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for key, value in sorted(merged.get(name, {}).items()):
+            label_values = json.loads(key)
+            if metric.kind == 'counter':
+                lines.append(f"{name}{_format_labels(metric.labels, label_values)} {_format_number(value)}")
+                continue
+            for bound, count in zip(metric.buckets, value):
+                lines.append(f"{name}_bucket{_format_labels(metric.labels, label_values, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_format_labels(metric.labels, label_values, [('le', '+Inf')])} {value[-1]}")
+            lines.append(f"{name}_sum{_format_labels(metric.labels, label_values)} {_format_number(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(metric.labels, label_values)} {value[-1]}")
+
+    cache = merged.get(CACHE_REQUESTS.name, {})
+    hits, misses = cache.get(json.dumps(['hit']), 0), cache.get(json.dumps(['miss']), 0)
+    lines.append("# HELP finance_response_cache_hit_ratio Share of response cache lookups that were hits.")
+    lines.append("# TYPE finance_response_cache_hit_ratio gauge")
+    lines.append(f"finance_response_cache_hit_ratio {hits / (hits + misses) if hits + misses else 0.0}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_AUTH_TOKEN
+    if token and request.META.get('HTTP_AUTHORIZATION') != f"Bearer {token}":
+        return HttpResponse("Unauthorized\n", status=401, content_type=CONTENT_TYPE)
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
+
+
+def _count_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender=None, connection=None, **kwargs):
+    """
+    Count the queries of ``connection`` for the request running them. Every
+    thread has its own connections, so the counter is added as each one
+    connects rather than around the request.
+    """
+    if _count_query not in connection.execute_wrappers:
+        # First, so context-managed wrappers pushed on top pop themselves
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+class MetricsMiddleware:
+    """
+    Record request latency, request counts and SQL queries per request,
+    labelled by the resolved route name. Removed from the stack unless
+    ``METRICS_ENABLED`` is on. Runs natively under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_counter, dispatch_uid='config.metrics.count_queries')
+        # Connections this thread opened before the middleware was loaded
+        for connection in connections.all(initialized_only=True):
+            _install_query_counter(connection=connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = [0]
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        return self.record(request, response, time.perf_counter() - started, queries[0])
+
+    async def __acall__(self, request):
+        queries = [0]
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        return self.record(request, response, time.perf_counter() - started, queries[0])
+
+    def record(self, request, response, elapsed, queries):
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name or match.route) if match else 'unmatched'
+        if route == 'metrics':
+            return response
+        REQUEST_SECONDS.observe(elapsed, route=route, method=request.method)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.observe(queries, route=route)
+        return response
@@ -0,0 +1,138 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.db.models import Q
+from drf_yasg import openapi
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+CURSOR_PAGINATION_PARAMS = [
+    openapi.Parameter(
+        'cursor',
+        openapi.IN_QUERY,
+        description="Opaque cursor taken from the previous page's `next` link",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'page_size',
+        openapi.IN_QUERY,
+        description="Items per page (max: 100)",
+        type=openapi.TYPE_INTEGER
+    ),
+    openapi.Parameter(
+        'fields',
+        openapi.IN_QUERY,
+        description="Comma-separated fields to return, e.g. `date,amount,category_name`",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'format',
+        openapi.IN_QUERY,
+        description="`columnar` returns field names once and each row as an array of values",
+        type=openapi.TYPE_STRING
+    )
+]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on the descending ``(date, created_at, id)`` key.
+
+    Pages are fetched with an index range scan from the last row seen, so there
+    is no ``COUNT(*)`` and page cost does not grow with depth. With
+    ``whole_days`` a page is extended to the end of its last day, so a day's
+    entries are never split across pages. Pages may be model instances or
+    ``values()`` dicts that include the key columns.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    date_field = 'date'
+    whole_days = False
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    @property
+    def key_fields(self):
+        return self.date_field, 'created_at', 'id'
+
+    def get_key(self, instance):
+        if isinstance(instance, dict):
+            return instance[self.date_field], instance['created_at'], instance['id']
+        return getattr(instance, self.date_field), instance.created_at, instance.pk
+
+    def encode_cursor(self, key):
+        row_date, created_at, pk = key
+        raw = f"{row_date.isoformat()}|{created_at.isoformat()}|{pk}"
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            row_date, created_at, pk = urlsafe_b64decode(encoded.encode()).decode().split('|')
+            return date.fromisoformat(row_date), datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, key):
+        row_date, created_at, pk = key
+        return (
+            Q(**{f'{self.date_field}__lt': row_date})
+            | Q(**{self.date_field: row_date, 'created_at__lt': created_at})
+            | Q(**{self.date_field: row_date, 'created_at': created_at, 'pk__lt': pk})
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(f'-{self.date_field}', '-created_at', '-pk')
+
+        cursor = self.decode_cursor(request)
+        if cursor:
+            queryset = queryset.filter(self.after(cursor))
+
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+
+        if self.has_next and self.whole_days:
+            last_key = self.get_key(page[-1])
+            page += list(queryset.filter(self.after(last_key), **{self.date_field: last_key[0]}))
+            self.has_next = queryset.filter(**{f'{self.date_field}__lt': last_key[0]}).exists()
+
+        self.next_key = self.get_key(page[-1]) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_key))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
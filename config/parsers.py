@@ -0,0 +1,25 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import json_backend, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    ``JSONParser`` that decodes with orjson when it is the ``JSON_BACKEND``.
+    Like DRF's strict parser, it rejects ``NaN`` and ``Infinity``.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if json_backend() != 'orjson':
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            content = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
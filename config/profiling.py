@@ -0,0 +1,86 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from .authentication import CustomJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+
+
+def is_privileged(request):
+    """
+    Whether the request's JWT carries ``PROFILING_CLAIM`` (truthy, or equal to
+    / containing ``PROFILING_CLAIM_VALUE`` when that is set).
+    """
+    try:
+        authenticated = CustomJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    if authenticated is None:
+        return False
+
+    claim = authenticated[1].get(settings.PROFILING_CLAIM)
+    expected = settings.PROFILING_CLAIM_VALUE
+    if not expected:
+        return bool(claim)
+    return claim == expected or (isinstance(claim, (list, tuple)) and expected in claim)
+
+
+def profile_path(request):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-')[:80] or 'root'
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+    return os.path.join(settings.PROFILING_DIR, f"{stamp}-{request.method}-{slug}-{uuid.uuid4().hex[:8]}.prof")
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with cProfile when it asks for it (``X-Profile: 1``
+    header or ``?profile=1``, honoured only for privileged JWT claims) or is
+    picked by the ``PROFILING_SAMPLE_RATE`` random sample, and dump the
+    pstats file under ``PROFILING_DIR``. Removed from the stack entirely
+    unless ``PROFILING_ENABLED`` is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+
+    def should_profile(self, request):
+        requested = request.META.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_QUERY_PARAM) == '1'
+        if requested:
+            return is_privileged(request)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        path = profile_path(request)
+        profiler.dump_stats(path)
+        logger.info("profiled %s %s -> %s", request.method, request.path, path)
+        response['X-Profile-Id'] = os.path.basename(path)
+        return response
@@ -0,0 +1,116 @@
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKENDS = ('orjson', 'json')
+# Every DecimalField the API exposes is money stored with two decimal places
+MONEY_QUANTUM = Decimal("0.01")
+
+
+def json_backend():
+    """
+    The configured ``JSON_BACKEND``, falling back to the stdlib when orjson is not installed.
+    """
+    return 'orjson' if settings.JSON_BACKEND == 'orjson' and orjson is not None else 'json'
+
+
+def exact_decimals(request):
+    """
+    Whether the request's API version (``Accept: application/json; version=N``)
+    gets Decimal values as exact strings rather than floats.
+    """
+    version = getattr(request, 'version', None)
+    return version is not None and int(version) >= settings.EXACT_DECIMAL_VERSION
+
+
+class ExactDecimalJSONEncoder(encoders.JSONEncoder):
+    """
+    Decimals as fixed-point strings with the money fields' ``decimal_places``.
+    Aggregates come back at whatever scale the database picks, so without it
+    a sum renders as ``"18722.4500000000"`` and an empty one as ``"0E-10"``.
+    """
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return format(obj.quantize(MONEY_QUANTUM) if obj.is_finite() else obj, 'f')
+        return super().default(obj)
+
+
+def dumps(data, encoder_class=encoders.JSONEncoder, backend=None):
+    """
+    Compact UTF-8 JSON, byte-identical to ``JSONRenderer``'s output. With
+    orjson, anything it does not encode the same way (Decimals, dates and
+    times, lazy strings) is handed to ``encoder_class.default``.
+    """
+    if (backend or json_backend()) == 'orjson' and api_settings.COMPACT_JSON and api_settings.UNICODE_JSON:
+        content = orjson.dumps(
+            data,
+            default=encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Escape the line separators that are invalid in JavaScript string literals, as JSONRenderer does
+        return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+    content = json.dumps(
+        data, cls=encoder_class, ensure_ascii=not api_settings.UNICODE_JSON, allow_nan=not api_settings.STRICT_JSON,
+        separators=SHORT_SEPARATORS if api_settings.COMPACT_JSON else LONG_SEPARATORS,
+    )
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class StreamingExportRenderer(BaseRenderer):
+    """
+    Negotiates the export format (``?format=`` or ``Accept``). Export rows are
+    streamed straight into a StreamingHttpResponse, so only non-streamed
+    responses such as errors reach ``render``; they are written as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=DjangoJSONEncoder).encode(self.charset)
+
+
+class CSVRenderer(StreamingExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(StreamingExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` on the ``JSON_BACKEND`` encoder. Indented output (the
+    browsable API, ``Accept: ...; indent=N``) keeps DRF's own path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if exact_decimals(renderer_context.get('request')):
+            # Renderers are instantiated per request
+            self.encoder_class = ExactDecimalJSONEncoder
+        if data is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data, self.encoder_class)
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    Opt-in compact list format (``?format=columnar``): the view sends field
+    names once and each row as an array of values.
+    """
+    media_type = 'application/vnd.finance.columnar+json'
+    format = 'columnar'
@@ -0,0 +1,145 @@
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+
+from .instrumentation import serializer_timing
+from .renderers import ColumnarJSONRenderer
+
+FIELDS_QUERY_PARAM = 'fields'
+FAST_SERIALIZER_CACHE_SIZE = 256
+
+
+def _identity(value):
+    return value
+
+
+class FastSerializer:
+    """
+    Read-only stand-in for a ``ModelSerializer`` on list endpoints.
+
+    The serializer's readable fields are resolved once into ``values()``
+    lookups (``category.name`` becomes a SQL join on ``category__name``) and
+    converters, which are the fields' own bound ``to_representation``
+    methods, so each row is a plain dict built without model instances or
+    per-row field introspection and renders byte-identically to the
+    serializer's output.
+
+    ``fields`` narrows the output (and the SELECT) to those field names, in
+    the serializer's order; unknown names raise ``ValueError``.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class()
+        model = serializer_class.Meta.model
+        self.columns = []
+        for field in serializer._readable_fields:
+            if field.source == '*' or field.source_attrs == []:
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.{field.field_name} cannot be read from values().")
+            if isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None:
+                lookup, convert = model._meta.get_field(field.source).attname, _identity
+            elif isinstance(field, RelatedField) or getattr(field, 'many', False):
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.{field.field_name} is not supported.")
+            else:
+                lookup, convert = '__'.join(field.source_attrs), field.to_representation
+            self.columns.append((field.field_name, lookup, convert))
+        if fields is not None:
+            unknown = set(fields) - {name for name, _, _ in self.columns}
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+            self.columns = [column for column in self.columns if column[0] in fields]
+        self.field_names = [name for name, _, _ in self.columns]
+        self.lookups = tuple(dict.fromkeys(lookup for _, lookup, _ in self.columns))
+
+    def values(self, queryset, *extra):
+        """
+        ``queryset`` as raw dicts holding every lookup the output needs plus ``extra`` ones.
+        """
+        return queryset.values(*dict.fromkeys(self.lookups + extra))
+
+    def to_representation(self, row):
+        return {
+            name: None if row[lookup] is None else convert(row[lookup])
+            for name, lookup, convert in self.columns
+        }
+
+    def many(self, rows):
+        columns = self.columns
+        with serializer_timing():
+            return [
+                {name: None if row[lookup] is None else convert(row[lookup]) for name, lookup, convert in columns}
+                for row in rows
+            ]
+
+    def columnar(self, rows):
+        """
+        Rows as lists of values in ``field_names`` order.
+        """
+        columns = self.columns
+        with serializer_timing():
+            return [
+                [None if row[lookup] is None else convert(row[lookup]) for _, lookup, convert in columns]
+                for row in rows
+            ]
+
+
+def fast_serializer(serializer_class, fields=None):
+    """
+    Shared ``FastSerializer`` for ``serializer_class`` narrowed to ``fields``.
+    Output follows the serializer's field order, so ``fields`` is keyed as a
+    sorted set and ``?fields=amount,date`` reuses ``?fields=date,amount``.
+    """
+    return _fast_serializer(serializer_class, None if fields is None else tuple(sorted(set(fields))))
+
+
+# Bounded: ?fields= is client input, so the number of distinct keys is not
+@lru_cache(maxsize=FAST_SERIALIZER_CACHE_SIZE)
+def _fast_serializer(serializer_class, fields):
+    return FastSerializer(serializer_class, fields)
+
+
+def parse_fields(params):
+    """
+    ``?fields=date,amount`` as a tuple of names, or None when not given.
+    """
+    raw = params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+    return tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+
+
+class SparseFieldsMixin:
+    """
+    Read-only list support for ``?fields=`` and the columnar format.
+
+    ``?format=columnar`` (or ``Accept: application/vnd.finance.columnar+json``)
+    is offered on ``columnar_actions`` only; rows are then emitted as value
+    arrays and the field names once, under ``fields``.
+    """
+    columnar_actions = ('list',)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action in self.columnar_actions:
+            renderers.append(ColumnarJSONRenderer())
+        return renderers
+
+    @property
+    def columnar(self):
+        return getattr(self.request.accepted_renderer, 'format', None) == ColumnarJSONRenderer.format
+
+    def get_fast_serializer(self):
+        return fast_serializer(self.get_serializer_class(), parse_fields(self.request.query_params))
+
+    def serialize_rows(self, fast, rows):
+        return fast.columnar(rows) if self.columnar else fast.many(rows)
+
+    def with_field_names(self, fast, data):
+        return {'fields': fast.field_names, **data} if self.columnar else data
+
+    def paginated_fast_response(self, queryset):
+        fast = self.get_fast_serializer()
+        page = self.paginate_queryset(fast.values(queryset, *self.paginator.key_fields))
+        response = self.get_paginated_response(self.serialize_rows(fast, page))
+        response.data = self.with_field_names(fast, response.data)
+        return response
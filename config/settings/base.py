@@ -1,6 +1,7 @@
 from datetime import timedelta
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,17 +27,23 @@ INSTALLED_APPS = [
     'apps.accounts',
     'apps.expense',
     'apps.income',
+    'apps.reports',
+    'apps.outbox',
 ]
 
 MIDDLEWARE = [
+    'config.metrics.MetricsMiddleware',
+    'config.instrumentation.QueryTimingMiddleware',
+    'config.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.staticfiles.AsyncWhiteNoiseMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -57,6 +64,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 LANGUAGE_CODE = 'en-us'
 USE_I18N = True
@@ -71,9 +79,152 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Process-local; fine for a single runserver process. Deployments use shared_caches() below.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("CACHE_LOCATION", 'finance'),
+    }
+}
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_caches():
+    """
+    CACHES for deployments running several worker processes. Response cache
+    data versions, ETag versions and replica pins must be seen by every
+    worker, so a process-local backend is refused.
+    """
+    backend = os.getenv("CACHE_BACKEND", 'django.core.cache.backends.redis.RedisCache')
+    if backend in PROCESS_LOCAL_CACHE_BACKENDS:
+        raise ImproperlyConfigured(f"CACHE_BACKEND {backend} is not shared between worker processes; use e.g. Redis.")
+    if not os.getenv("CACHE_LOCATION"):
+        raise ImproperlyConfigured("CACHE_LOCATION must point at the shared cache, e.g. redis://cache:6379/1.")
+    return {'default': {'BACKEND': backend, 'LOCATION': os.getenv("CACHE_LOCATION")}}
+
+
+def celery_broker():
+    """
+    CELERY_BROKER_URL for deployments. Report jobs and outbox dispatches must
+    reach the worker processes, so the in-process memory:// broker is refused.
+    """
+    url = os.getenv("CELERY_BROKER_URL", "")
+    if not url or url.startswith('memory://'):
+        raise ImproperlyConfigured("CELERY_BROKER_URL must point at the shared broker, e.g. redis://broker:6379/0.")
+    return url
+
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Per-request query/timing instrumentation (Server-Timing header + config.instrumentation log lines)
+REQUEST_INSTRUMENTATION = os.getenv("REQUEST_INSTRUMENTATION", "False").lower() in ('1', 'true', 'yes')
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+
+# Sampled cProfile profiling; explicit ?profile=1 / X-Profile: 1 requests need the privileged claim
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() in ('1', 'true', 'yes')
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_CLAIM = os.getenv("PROFILING_CLAIM", "is_superuser")
+PROFILING_CLAIM_VALUE = os.getenv("PROFILING_CLAIM_VALUE")
+PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(BASE_DIR, 'logs', 'profiles'))
+
+# Prometheus /metrics; with several worker processes point METRICS_MULTIPROC_DIR at a
+# directory shared by them (and emptied on deploy) so every scrape sums all workers.
+# Deployments require METRICS_AUTH_TOKEN through metrics_auth_token() below.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in ('1', 'true', 'yes')
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1))
+METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN")
+
+
+def metrics_auth_token():
+    """
+    METRICS_AUTH_TOKEN for deployments. Without a token /metrics is served to
+    anyone, so it is required while METRICS_ENABLED is on.
+    """
+    if METRICS_ENABLED and not METRICS_AUTH_TOKEN:
+        raise ImproperlyConfigured("METRICS_AUTH_TOKEN must be set while METRICS_ENABLED is on (or set METRICS_ENABLED=False).")
+    return METRICS_AUTH_TOKEN
+
+
+# No worker consumes the in-process memory:// broker, so without a real broker tasks run eagerly
+# in the calling process. Deployments use celery_broker() above.
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "memory://")
+CELERY_TASK_ALWAYS_EAGER = os.getenv(
+    "CELERY_TASK_ALWAYS_EAGER", str(CELERY_BROKER_URL.startswith('memory://'))
+).lower() in ('1', 'true', 'yes')
+if CELERY_BROKER_URL.startswith('memory://') and not CELERY_TASK_ALWAYS_EAGER:
+    raise ImproperlyConfigured("Tasks sent to the memory:// broker never run; set CELERY_BROKER_URL or CELERY_TASK_ALWAYS_EAGER=True.")
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-outbox': {
+        'task': 'apps.outbox.tasks.dispatch_outbox',
+        'schedule': float(os.getenv("OUTBOX_DISPATCH_INTERVAL", 5)),
+    },
+    'fail-stale-report-jobs': {
+        'task': 'apps.reports.tasks.fail_stale_report_jobs',
+        'schedule': 300.0,
+    },
+}
+
+# Finance events are POSTed here in batches by the outbox dispatcher; unset leaves them queued
+OUTBOX_EVENTS_URL = os.getenv("OUTBOX_EVENTS_URL")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+OUTBOX_RETRY_BASE_DELAY = float(os.getenv("OUTBOX_RETRY_BASE_DELAY", 5))
+OUTBOX_TIMEOUT = float(os.getenv("OUTBOX_TIMEOUT", 5))
+# How long a claimed batch may stay 'sending' before another dispatcher takes it over; keep it
+# well above a delivery's worst case (OUTBOX_TIMEOUT for each transport retry)
+OUTBOX_SEND_LEASE = float(os.getenv("OUTBOX_SEND_LEASE", 60))
+
+# Generated report job artifacts, served only through the authenticated download endpoint
+REPORT_STORAGE_ROOT = os.getenv("REPORT_STORAGE_ROOT", os.path.join(BASE_DIR, 'generated_reports'))
+# Hard time limit of a report task; a job still running after it is claimed again or failed
+REPORT_JOB_TIMEOUT = int(os.getenv("REPORT_JOB_TIMEOUT", 1800))
+
+# Read replicas: aliases in DATABASES that replica-safe reads are spread over (see config.db_router)
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+DATABASE_REPLICAS = []
+# How long a tenant's reads stay on the primary after one of its writes; keep above the replication lag
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+# Viewset actions whose GETs may read from a replica
+REPLICA_READ_ACTIONS = ('list', 'summary', 'export', 'cash_flow', 'dashboard')
+
+
+def replica_databases(primary, hosts):
+    """
+    ``replica_<n>`` DATABASES entries copying ``primary`` for each host in the
+    comma-separated ``hosts``. Under tests they mirror the primary.
+    """
+    return {
+        f'replica_{index}': {**primary, 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+        for index, host in enumerate(filter(None, (host.strip() for host in hosts.split(','))), 1)
+    }
+
+
+# "orjson" (used when installed, else the stdlib) or "json"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
+# API version (Accept: application/json; version=N) from which Decimal values are exact strings instead of floats
+EXACT_DECIMAL_VERSION = 2
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.AcceptHeaderVersioning',
+    'DEFAULT_VERSION': '1',
+    'ALLOWED_VERSIONS': ('1', '2'),
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'config.authentication.CustomJWTAuthentication',
     ),
@@ -106,6 +257,10 @@ SIMPLE_JWT = {
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 }
 
+# Validated JWTs kept in-process by CustomJWTAuthentication (never beyond the token's exp)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", 300))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'JWT': {
@@ -9,7 +9,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Stand-in read replica (not replicated); reads only go to it once listed in DATABASE_REPLICAS
+    'replica_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+    },
 }
 
 # email
@@ -44,6 +49,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'config.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'django.server': {
             'handlers': ['console'],
             'level': 'INFO',
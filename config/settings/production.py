@@ -15,6 +15,11 @@ DATABASES = {
 
     }
 }
+DATABASES.update(replica_databases(DATABASES['default'], os.getenv("DB_REPLICA_HOSTS", "")))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+CACHES = shared_caches()
+CELERY_BROKER_URL = celery_broker()
+METRICS_AUTH_TOKEN = metrics_auth_token()
 
 # email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -19,6 +19,11 @@ DATABASES = {
         'PORT': os.getenv("PORT"),
     }
 }
+DATABASES.update(replica_databases(DATABASES['default'], os.getenv("DB_REPLICA_HOSTS", "")))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+CACHES = shared_caches()
+CELERY_BROKER_URL = celery_broker()
+METRICS_AUTH_TOKEN = metrics_auth_token()
 
 # email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -80,5 +85,10 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": True,
         },
+        "config.instrumentation": {
+            "handlers": ["debug_file", "console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
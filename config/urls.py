@@ -2,10 +2,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .metrics import metrics_view
 from .schemas import schema_view
 
 urlpatterns = [
     path("api/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path("", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
 ]